@@ -1,11 +1,13 @@
 
 import sys
+import functools
 from abc import ABC, abstractmethod
 
 from commandintegrator.core.callback import Callback
 from commandintegrator.core.internals import _cim
 from commandintegrator.core.enumerators import CommandPronoun
 from commandintegrator.models.message import Message
+from commandintegrator.models.tokenizedmessage import TokenizedMessage
 
 
 """
@@ -131,6 +133,18 @@ class FeatureCommandParserBase(FeatureCommandParserABC):
     def ignore_all(self, char: str):
         self.ignored_chars[char] = ''
 
+    def tokenize(self, message: Message) -> TokenizedMessage:
+        """
+        Return the TokenizedMessage for the received message
+        as seen by this parser, with the replacements in
+        ignored_chars applied to its words if there are any.
+        The message is never altered.
+        """
+        tokens = TokenizedMessage.of(message)
+        if self._ignored_chars:
+            return tokens.translate(self._ignored_chars)
+        return tokens
+
     def is_contender_for_processing(self, message: Message) -> bool:
         """
         Iterate over the words in received message, and 
@@ -138,11 +152,8 @@ class FeatureCommandParserBase(FeatureCommandParserABC):
         provided for an instance of this class. If a match
         is found, return True, else False.
         """
-        for key in self.ignored_chars:
-            message.content = [word.replace(key, self._ignored_chars[key]) for word in message.content]
-
-        for word in message.content:
-            if word.lower().strip(FeatureCommandParserBase.IGNORED_CHARS) in self:
+        for word in self.tokenize(message).words:
+            if word in self:
                 return True
         return False
     
@@ -153,8 +164,9 @@ class FeatureCommandParserBase(FeatureCommandParserABC):
         should be overloaded if a different return behavior 
         in a no-match-found scenario is desired.
         """
+        tokens = self.tokenize(message)
         for cb in self._callbacks:
-            match = cb.matches(message)
+            match = cb.matches(tokens)
             if match: return cb
         return None
 
@@ -279,7 +291,7 @@ class FeatureBase(FeatureABC):
         callback = self._command_parser.get_callback(message)
         if callback:
             if callback.interactive:
-                return lambda m = message: callback.func(m)
+                return functools.partial(callback.func, message)
             return callback.func
         return None
 
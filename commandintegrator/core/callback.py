@@ -1,5 +1,5 @@
-from itertools import zip_longest
 from commandintegrator.models.message import Message
+from commandintegrator.models.tokenizedmessage import TokenizedMessage
 
 """
 Details:
@@ -42,9 +42,10 @@ class Callback:
 
 	__slots__ = ('_lead', '_trail', '_func', '_bindings', 
 				 '_interactive', '_ordered', '_intact_lead', 
-				 '_intact_trail')
+				 '_intact_trail', '_matcher')
 
 	def __init__(self, lead, func, trail = None, ordered = False, interactive = False):
+		self._matcher = None
 		self.interactive = interactive
 		self.bindings = dict()
 		self.func = func
@@ -55,7 +56,7 @@ class Callback:
 	def __repr__(self):
 		return f"Callback Object(lead: {self._lead}, trail: {self._trail}, func: {self._func})"
 
-	def matches(self, message: Message) -> bool:
+	def matches(self, message: Message, positions: dict = None) -> bool:
 		"""
 		Boolean indicator to whether the callback
 		matches a given message, without returning
@@ -66,72 +67,53 @@ class Callback:
 		defined in this object.
 
 		To begin with, the message has to match at least
-		one word in the self.lead property. This is asserted
-		through the .intersection method, as to get the word(s)
-		that matches the self.lead property in a subset.
-		Next, the optional self.trail property is investigated
-		similarly if it is defined - otherwise not. 
+		one word in the self.lead property. Next, the optional
+		self.trail property is investigated similarly if it
+		is defined - otherwise not. 
 
 		The self.trail string / collection of strings has to,
 		by definition, appear delay the words in self.lead.
-		This is asserted by first identifying the words that
-		matches the trail in the message. The words that also
-		are present in the lead are removed by subtraction.
-		Next, by iterating over the two collections the order
-		of appearence can now be determined by identifying
-		the index of the word compared between the two. If 
-		the index is higher in the trail than the lead, the
-		loop continues and will eventually exhaust. 
-		If not, the trail condition is not met and method
-		exits with False.
+		This is asserted by comparing the first occurence
+		of the latest matching word in the lead with that
+		of the trail. If the index is higher in the trail
+		than the lead, the trail condition is met.
+
+		The matching itself is done by a CallbackMatcher,
+		compiled once for the lead, trail and ordered 
+		properties of this instance, against the word 
+		positions of the TokenizedMessage. Pass a 
+		TokenizedMessage to share it between callbacks,
+		other messages are tokenized on every call, unless
+		the positions are built once with 
+		Callback.word_positions and passed along.
 
 		:param message:
-			commandintegrator.Message
+			commandintegrator.Message or TokenizedMessage
+		:param positions:
+			dict, word -> positions, see Callback.word_positions.
+			Taken from the TokenizedMessage if omitted.
 		:returns:
 			Bool, True if self matches command
 		"""
-		match_trail = False
-		lowered = [i.lower().strip(Callback.IGNORED_CHARS) for i in message.content]
-
-		if not (match_lead := [i for i in self._lead if i in lowered]):
-			return None
-		elif self._ordered and not self._assert_ordered(lowered):
-			return None
-
-		if self._trail:
-			latest_lead_occurence, latest_trail_occurence = 0, 0
-
-			if not (match_trail := [i for i in self._trail if i in lowered]):
-				return None
-
-			for lead, trail in zip_longest(match_lead, match_trail):
-				try:
-					_index = lowered.index(lead)
-					if _index > latest_lead_occurence:
-						latest_lead_occurence = _index
-				except ValueError:
-					pass
-				try:
-					_index = lowered.index(trail)
-					if _index> latest_trail_occurence:
-						latest_trail_occurence = _index
-				except ValueError:
-					pass
-			match_trail = (latest_trail_occurence > latest_lead_occurence)
-		return match_lead and match_trail or match_lead and not self._trail
-
-	def _assert_ordered(self, message: list) -> bool:
-		ordered_trail, ordered_lead = True, True
-		for word_a, word_b in zip([i for i in message if i in self._lead], self._lead):
-			if word_a != word_b: 
-				ordered_lead = False
-				break
-		if not self._trail:	return ordered_lead
-		for word_a, word_b in zip([i for i in message if i in self._trail], self._trail):
-			if word_a != word_b: 
-				ordered_trail = False
-				break
-		return ordered_trail and ordered_lead
+		if positions is None:
+			positions = TokenizedMessage.of(message).positions
+		if self._matcher is None:
+			self._matcher = CallbackMatcher(self._lead, self._trail, self._ordered)
+		return self._matcher.matches(positions)
+
+	@staticmethod
+	def word_positions(words: list) -> dict:
+		"""
+		Map every word in a message, lowered and stripped
+		from IGNORED_CHARS, to the positions in which it 
+		occurs in the message.
+
+		:param words:
+			list with words (string split on space)
+		:returns:
+			dict, word -> tuple of positions in ascending order
+		"""
+		return dict(TokenizedMessage.from_words(None, words).positions)
 
 	@property
 	def bindings(self) -> dict:
@@ -153,6 +135,7 @@ class Callback:
 		except TypeError:
 			raise AttributeError("Callback: items in 'lead' and 'trail' must be str")
 		self._lead = lead
+		self._matcher = None
 
 	@property
 	def trail(self) -> tuple:
@@ -160,6 +143,7 @@ class Callback:
 
 	@trail.setter
 	def trail(self, trail: tuple):
+		self._matcher = None
 		if trail is None: 
 			self._trail = None
 			return
@@ -196,4 +180,64 @@ class Callback:
 
 	@ordered.setter
 	def ordered(self, ordered: bool):
-		self._ordered = ordered
\ No newline at end of file
+		self._ordered = ordered
+		self._matcher = None
+
+
+class CallbackMatcher:
+	"""
+	CallbackMatcher class
+	The compiled form of the lead, trail and ordered
+	properties of a Callback. The words are kept in 
+	frozensets for constant time lookups, and the
+	message is represented by a map of each word to 
+	the positions in which it occurs, as returned by
+	Callback.word_positions, which is built once per
+	message and shared by all callbacks matching it.
+	"""
+
+	__slots__ = ('_lead', '_trail', '_ordered', '_lead_set', '_trail_set')
+
+	def __init__(self, lead: tuple, trail: tuple = None, ordered: bool = False):
+		self._lead = tuple(lead)
+		self._trail = tuple(trail) if trail else ()
+		self._ordered = ordered
+		self._lead_set = frozenset(self._lead)
+		self._trail_set = frozenset(self._trail)
+
+	def matches(self, positions: dict) -> bool:
+		"""
+		:param positions:
+			dict, word -> positions, see Callback.word_positions
+		:returns:
+			Bool, True if the message matches the lead, and 
+			the trail if present, in the required order.
+		"""
+		if not (match_lead := [i for i in self._lead_set if i in positions]):
+			return False
+		elif self._ordered and not self._assert_ordered(positions, match_lead, self._lead):
+			return False
+		if not self._trail:
+			return True
+
+		if not (match_trail := [i for i in self._trail_set if i in positions]):
+			return False
+		elif self._ordered and not self._assert_ordered(positions, match_trail, self._trail):
+			return False
+
+		latest_lead_occurence = max(positions[i][0] for i in match_lead)
+		latest_trail_occurence = max(positions[i][0] for i in match_trail)
+		return latest_trail_occurence > latest_lead_occurence
+
+	@staticmethod
+	def _assert_ordered(positions: dict, matches: list, sequence: tuple) -> bool:
+		"""
+		The words of the sequence found in the message, in
+		the order they occur in the message, must follow 
+		the order in which they are given in the sequence.
+		"""
+		occurences = sorted((index, word) for word in matches for index in positions[word])
+		for (_, word_a), word_b in zip(occurences, sequence):
+			if word_a != word_b:
+				return False
+		return True
\ No newline at end of file
@@ -0,0 +1,204 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from commandintegrator.core.decorators import Logger
+
+"""
+Details:
+    commandintegrator framework CallbackPool source file
+
+Module details:
+
+    The CallbackPool is an execution layer for the
+    callbacks returned by Features. When assigned to a
+    CommandProcessor, the response of each Interpretation
+    is dispatched to a bounded pool of threads or processes
+    instead of running inline in the caller, with a limit
+    to how many callbacks of the same Feature may run at
+    once and a timeout, after which a fallback response
+    is given instead.
+"""
+
+
+class CallbackPool:
+    """
+    Bounded pool of workers for Feature callbacks.
+
+    max_workers:
+        (int) size of the pool, defaults to the default
+        of the underlying concurrent.futures executor
+    per_feature_limit:
+        (int) how many callbacks of the same Feature that
+        can run at once. When the limit is reached, the
+        fallback response is given right away. No limit
+        if omitted.
+    timeout:
+        (float) seconds to wait for a callback before
+        the fallback response is given. The callback is
+        not interrupted, it keeps its slot in the pool and
+        towards the per_feature_limit until it returns.
+    processes:
+        (bool) use a pool of processes instead of threads.
+        Callbacks must then be picklable, which excludes
+        interactive callbacks and coroutine functions.
+    fallback_key:
+        (str) key in CommandProcessor.DEFAULT_RESPONSES
+        with the phrases used as fallback response
+    """
+
+    def __init__(self, max_workers: int = None, per_feature_limit: int = None,
+                 timeout: float = None, processes: bool = False,
+                 fallback_key: str = 'NoImplementation'):
+        if processes:
+            self._executor = ProcessPoolExecutor(max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix = 'CallbackPool')
+        self.per_feature_limit = per_feature_limit
+        self.timeout = timeout
+        self.fallback_key = fallback_key
+        self._semaphores = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'CallbackPool(per_feature_limit={self.per_feature_limit}, ' \
+               f'timeout={self.timeout}, executor={type(self._executor).__name__})'
+
+    @staticmethod
+    def name_of(feature) -> str:
+        """
+        The name of the feature, as used in the logs
+        """
+        if isinstance(feature, str):
+            return feature
+        return getattr(feature, 'name', None) or type(feature).__name__
+
+    def _acquire(self, feature) -> bool:
+        """
+        Take a slot for the feature without blocking, returns
+        False if the feature is at its per_feature_limit.
+        """
+        if self.per_feature_limit is None:
+            return True
+        with self._lock:
+            if (semaphore := self._semaphores.get(feature)) is None:
+                semaphore = self._semaphores[feature] = threading.BoundedSemaphore(self.per_feature_limit)
+        return semaphore.acquire(blocking = False)
+
+    def _release(self, feature) -> None:
+        if self.per_feature_limit is not None:
+            self._semaphores[feature].release()
+
+    def _at_limit(self, feature, fallback: callable) -> object:
+        Logger.log(f'CallbackPool: {self.name_of(feature)} is at its limit of '
+                   f'{self.per_feature_limit} running callbacks', level = 'error')
+        return fallback()
+
+    def _timed_out(self, feature, fallback: callable) -> object:
+        Logger.log(f'CallbackPool: callback in {self.name_of(feature)} timed out '
+                   f'after {self.timeout} seconds', level = 'error')
+        return fallback()
+
+    def submit(self, feature, func: callable) -> Future:
+        """
+        Dispatch the callback to the pool.
+
+        :param feature:
+            the Feature instance the callback belongs to,
+            by which the per_feature_limit is kept. Any
+            hashable, such as a name, is accepted as well.
+        :param func:
+            callable, taking no arguments
+        :returns:
+            concurrent.futures.Future, or None if the feature
+            is at its per_feature_limit
+        """
+        if not self._acquire(feature):
+            return None
+        try:
+            future = self._executor.submit(func)
+        except Exception:
+            self._release(feature)
+            raise
+        future.add_done_callback(lambda _: self._release(feature))
+        return future
+
+    def call(self, feature, func: callable, fallback: callable) -> object:
+        """
+        Run the callback in the pool and wait for its output,
+        at most for self.timeout seconds. Exceptions raised by
+        the callback are raised in the caller, as if it was
+        called inline.
+
+        :param fallback:
+            callable, returning the response given if the
+            feature is at its limit or the callback times out
+        """
+        if (future := self.submit(feature, func)) is None:
+            return self._at_limit(feature, fallback)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            return self._timed_out(feature, fallback)
+
+    async def acall(self, feature, func: callable, fallback: callable) -> object:
+        """
+        Coroutine counterpart of the call method. Coroutine
+        functions are awaited on the running loop, with the
+        same limit and timeout as callbacks run in the pool.
+        """
+        if inspect.iscoroutinefunction(func):
+            if not self._acquire(feature):
+                return self._at_limit(feature, fallback)
+            try:
+                return await asyncio.wait_for(func(), self.timeout)
+            except asyncio.TimeoutError:
+                return self._timed_out(feature, fallback)
+            finally:
+                self._release(feature)
+
+        if (future := self.submit(feature, func)) is None:
+            return self._at_limit(feature, fallback)
+        try:
+            output = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            return self._timed_out(feature, fallback)
+        if inspect.isawaitable(output):
+            return await output
+        return output
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait = wait)
+
+
+class PooledCallback:
+    """
+    The response of an Interpretation when the
+    CommandProcessor has a CallbackPool. Calling it
+    runs the callback in the pool, and the acall
+    coroutine does the same without blocking the
+    event loop.
+    """
+
+    __slots__ = ('pool', 'feature', 'func', 'fallback')
+
+    def __init__(self, pool: CallbackPool, feature, func: callable, fallback: callable):
+        self.pool = pool
+        self.feature = feature
+        self.func = func
+        self.fallback = fallback
+
+    def __repr__(self):
+        return f'PooledCallback(feature_name={self.feature_name}, func={self.func})'
+
+    @property
+    def feature_name(self) -> str:
+        return CallbackPool.name_of(self.feature)
+
+    def __call__(self):
+        return self.pool.call(self.feature, self.func, self.fallback)
+
+    async def acall(self):
+        return await self.pool.acall(self.feature, self.func, self.fallback)
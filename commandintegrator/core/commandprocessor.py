@@ -1,13 +1,20 @@
 import sys
+import asyncio
+import inspect
 import random
 import traceback
 
 from collections.abc import Iterable
+from concurrent.futures import Executor
+from typing import Generator
+from commandintegrator.core.callbackpool import CallbackPool, PooledCallback
+from commandintegrator.core.configuration import configure
 from commandintegrator.core.internals import _cim
 from commandintegrator.core.interpretation import Interpretation
 from commandintegrator.core.pronounlookuptable import PronounLookupTable
 from commandintegrator.models.message import Message
-from commandintegrator.baseclasses.baseclasses import FeatureBase
+from commandintegrator.models.tokenizedmessage import TokenizedMessage
+from commandintegrator.baseclasses.baseclasses import FeatureBase, FeatureCommandParserBase
 
 """
 Details:
@@ -32,13 +39,32 @@ class CommandProcessor:
     Interpretation. 
 
     Default Responses class variable is designed to be
-    set by __init__ in this package, loaded from the
-    local .json file. 
+    set by the configure function in this package, loaded
+    from the local .json file when the first instance is
+    created. 
+
+    executor: optional concurrent.futures.Executor in
+    which synchronous callbacks are run when messages are
+    processed with the aprocess coroutine. The default 
+    executor of the event loop is used if omitted.
+
+    callback_pool: optional CallbackPool to which the 
+    callbacks returned by features are dispatched when 
+    the response of an Interpretation is called, with a
+    concurrency limit per feature and a timeout. 
+
+    detect_language: whether to detect the language of
+    messages among the languages assigned to the 
+    PronounLookupTable, when none is given as the 
+    language parameter when they are processed.
     """
 
     DEFAULT_RESPONSES: dict = None
 
-    def __init__(self, default_responses: dict = None, pronoun_lookup_table: PronounLookupTable = None):
+    def __init__(self, default_responses: dict = None, pronoun_lookup_table: PronounLookupTable = None,
+                 executor: Executor = None, callback_pool: CallbackPool = None,
+                 detect_language: bool = False):
+        configure()
         if pronoun_lookup_table:
             message = f'{_cim.deprecated_warn}: ' \
                        'The "pronoun_lookup_table" property is no longer necessary.'
@@ -49,50 +75,210 @@ class CommandProcessor:
             sys.stdout.write(message)
 
         self._feature_pronoun_mapping = dict()
+        self._keyword_index = dict()
+        self._unindexed_features = ()
+        self.executor = executor
+        self.callback_pool = callback_pool
+        self.detect_language = detect_language
 
         if CommandProcessor.DEFAULT_RESPONSES is None:
             sys.stderr.write(f'{_cim.err}: CommandProcessor has no default responses and will not function normally')
 
 
+    @property
+    def executor(self) -> Executor:
+        return self._executor
+
+    @executor.setter
+    def executor(self, executor: Executor):
+        if executor is not None and not isinstance(executor, Executor):
+            raise TypeError(f'{_cim.warn}: executor must be a concurrent.futures.Executor, got {type(executor)}')
+        self._executor = executor
+
+    @property
+    def callback_pool(self) -> CallbackPool:
+        return self._callback_pool
+
+    @callback_pool.setter
+    def callback_pool(self, callback_pool: CallbackPool):
+        if callback_pool is not None and not isinstance(callback_pool, CallbackPool):
+            raise TypeError(f'{_cim.warn}: callback_pool must be a CallbackPool, got {type(callback_pool)}')
+        self._callback_pool = callback_pool
+
     @property
     def features(self) -> tuple:
         return self._features
     
     @features.setter
     def features(self, features: tuple):
+        """
+        Assign the features and build the keyword index used
+        for routing. Every keyword of every feature's command
+        parser is mapped to the position(s) of the feature(s)
+        that listens to it, so that a message only has to be
+        looked up word by word instead of being offered to
+        every feature in turn.
+
+        Features whose command parser overrides how contenders
+        are identified, or which rewrites characters through
+        ignored_chars, cannot be indexed and are asked directly
+        like before. Note that the index is a snapshot: reassign
+        the features if keywords are changed delay assignment.
+        """
         if not isinstance(features, Iterable) and isinstance(features, FeatureBase):
             features = (features,)
 
-        for feature in features:
+        keyword_index = dict()
+        unindexed_features = []
+
+        for position, feature in enumerate(features):
             if isinstance(feature, FeatureBase):
                 if feature.mapped_pronouns:
                     self._feature_pronoun_mapping[feature] = feature.mapped_pronouns
             else:
                 raise AttributeError(
                     f'{_cim.err}: CommandProcessor does not accept provided features')
+
+            if not CommandProcessor._is_indexable(feature.command_parser):
+                unindexed_features.append(position)
+                continue
+            for keyword in feature.command_parser.keywords:
+                positions = keyword_index.setdefault(keyword, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        self._keyword_index = {key: tuple(val) for key, val in keyword_index.items()}
+        self._unindexed_features = tuple(unindexed_features)
         self._features = features
 
-    def process(self, message: Message) -> Interpretation:
+    @staticmethod
+    def _is_indexable(command_parser: FeatureCommandParserBase) -> bool:
+        """
+        Whether the command parser identifies contenders with
+        the default keyword lookup of FeatureCommandParserBase,
+        which is what the keyword index reproduces.
+        """
+        parser_type = type(command_parser)
+        return (isinstance(command_parser, FeatureCommandParserBase)
+                and parser_type.is_contender_for_processing is FeatureCommandParserBase.is_contender_for_processing
+                and parser_type.__contains__ is FeatureCommandParserBase.__contains__
+                and parser_type.tokenize is FeatureCommandParserBase.tokenize
+                and not command_parser.ignored_chars)
+
+    def _get_contenders(self, tokens: TokenizedMessage) -> list:
+        """
+        Return the features that are contenders for processing
+        the message, in the order they were assigned. Indexed
+        features are found by looking up each word of the message
+        in the keyword index, the remaining ones are asked.
+        """
+        candidates = {i for i in self._unindexed_features
+                      if self._features[i].command_parser.is_contender_for_processing(tokens)}
+
+        for word in tokens.words:
+            if (positions := self._keyword_index.get(word)):
+                candidates.update(positions)
+        return [self._features[i] for i in sorted(candidates)]
+
+    def process(self, message: Message, language: str = None) -> Interpretation:
         """
         Part of the public interface. This method takes a Message
         object (OR another construct with a .content property that is the message body)
         - and splits the .content property on space characters
-        turning it in to a list. The message is decomposed by the
-        private _interpret method for identifying pronouns, which
-        funnel the message to the appropriate features in the 
-        self._features collection. As an instance of Interpretation
-        is returned from this call, it is passed on to the caller.
+        in to a TokenizedMessage, which is shared by every stage 
+        of the routing. The message itself is left untouched, so
+        the same message can be processed again, or concurrently
+        by other CommandProcessor instances. The tokens are 
+        decomposed by the private _interpret method for identifying
+        pronouns, which funnel the message to the appropriate 
+        features in the self._features collection. As an instance
+        of Interpretation is returned from this call, it is passed
+        on to the caller.
+
+        The pronouns are identified in the given language, among
+        the ones assigned to the PronounLookupTable. If omitted, 
+        the language is detected if self.detect_language is set,
+        otherwise the default language is used.
+        """
+        return self._process(message, language)
+
+    async def aprocess(self, message: Message, language: str = None) -> Interpretation:
         """
-        message.content = message.content.split()
+        Part of the public interface. Coroutine counterpart of
+        the process method, for front ends running in asyncio.
+        The message is routed like with process, but the 
+        response of the returned Interpretation is a coroutine
+        function which is awaited for the output:
+
+        >>    interpretation = await processor.aprocess(message)
+        >>    output = await interpretation.response()
+
+        Callbacks that are coroutine functions are awaited on the
+        running loop, while synchronous callbacks are run in the
+        executor of this instance so they do not block the loop.
+        """
+        interpretation = self._process(message, language)
+        interpretation.response = self._make_awaitable(interpretation.response)
+        return interpretation
+
+    def _make_awaitable(self, response: callable) -> callable:
+        """
+        Wrap the response callable of an Interpretation in a
+        coroutine function, running it in the executor unless
+        it is a coroutine function itself.
+        """
+        if isinstance(response, PooledCallback):
+            return response.acall
+        if response is None or inspect.iscoroutinefunction(response):
+            return response
+        executor = self._executor
+
+        async def awaitable_response():
+            output = await asyncio.get_running_loop().run_in_executor(executor, response)
+            if inspect.isawaitable(output):
+                return await output
+            return output
+        return awaitable_response
+
+    def process_many(self, messages: Iterable, language: str = None) -> Generator[Interpretation, None, None]:
+        """
+        Part of the public interface. Process a collection of
+        messages in a row, such as a chat backlog, yielding an
+        Interpretation for each message in the same order as 
+        they are received. 
+
+        Words that reoccur in the batch are only normalized once,
+        as the tokenization table is shared between all messages
+        in the batch, as is the keyword index of the features and
+        the precomputed PronounLookupTable. Errors are isolated per
+        message, as with the process method, so one broken 
+        message does not end the batch.
+
+        :param messages:
+            iterable with Message objects (OR other constructs
+            with a .content property that is the message body)
+        :param language:
+            str, language of the messages, see the process method
+        :returns:
+            generator, yielding Interpretation instances
+        """
+        tokenization_cache = dict()
+        for message in messages:
+            yield self._process(message, language, tokenization_cache)
+
+    def _process(self, message: Message, language: str = None, 
+                 tokenization_cache: dict = None) -> Interpretation:
+        tokens = None
         try:
-            return self._interpret(message)
+            tokens = TokenizedMessage.from_message(message, tokenization_cache)
+            return self._interpret(tokens, language)
         except Exception as e:
             sys.stderr.write(f'{_cim.err}: Error occured in CommandProcessor _interpret function: {e}')
             return Interpretation(error = traceback.format_exc(),
                         response = lambda: f'CommandProcessor: Internal error, see logs.',
-                        original_message = tuple(message.content))
+                        original_message = tokens.raw if tokens else ())
    
-    def _interpret(self, message: Message) -> Interpretation:
+    def _interpret(self, message: TokenizedMessage, language: str = None) -> Interpretation:
         """
         Identify the pronouns in the given message. Try to 
         match the pronouns aganst the mapped pronouns property
@@ -103,14 +289,18 @@ class CommandProcessor:
         the response.
         """
         return_callable = None
-        found_pronouns = PronounLookupTable.lookup(message.content)
-        mapped_features = [i for i in self._features if i.command_parser.is_contender_for_processing(message)]
+        if language is None and self.detect_language:
+            language = PronounLookupTable.detect_language(message.words)
+        found_pronouns = PronounLookupTable.lookup(message.raw, language)
+        language = language or PronounLookupTable.LANGUAGE
+        mapped_features = self._get_contenders(message)
 
         if not mapped_features:
             return Interpretation(
                 command_pronouns = found_pronouns,
+                language = language,
                 feature_name = None,
-                original_message = tuple(message.content),
+                original_message = message.raw,
                 response = lambda: random.choice(CommandProcessor.DEFAULT_RESPONSES['NoResponse']))
 
         for feature in mapped_features:
@@ -118,13 +308,22 @@ class CommandProcessor:
 
             if return_callable is None:
                 continue
+            if self._callback_pool is not None:
+                return_callable = PooledCallback(
+                    pool = self._callback_pool,
+                    feature = feature,
+                    func = return_callable,
+                    fallback = lambda key = self._callback_pool.fallback_key: 
+                        random.choice(CommandProcessor.DEFAULT_RESPONSES[key]))
             return Interpretation(
                 command_pronouns = found_pronouns,
+                language = language,
                 feature_name = feature.__class__.__name__,
                 response = return_callable,
-                original_message = tuple(message.content))
+                original_message = message.raw)
 
         return Interpretation(command_pronouns = found_pronouns,
+            language = language,
             feature_name = feature.__class__.__name__,
             response = lambda: random.choice(CommandProcessor.DEFAULT_RESPONSES['NoCallbackBinding']),
-            original_message = tuple(message.content))
\ No newline at end of file
+            original_message = message.raw)
\ No newline at end of file
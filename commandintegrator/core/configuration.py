@@ -0,0 +1,175 @@
+import sys
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from commandintegrator.core.decorators import Logger
+from commandintegrator.core.internals import _cim
+from commandintegrator.core.pronounlookuptable import PronounLookupTable
+
+"""
+Details:
+    commandintegrator framework configuration source file
+
+Module details:
+
+    The details below will read and configure commandintegrator
+    according to the settings found in the settings file, by default
+    named "commandintegrator.settings".
+    The settings file is presumed to be located delay the package
+    root.
+
+    The configuration file is used throughout the framework, so editing
+    these values will require editing elsewhere in the stack where you
+    use the CommandProcessor class for instance, and assign default
+    response phrases.
+
+    Nothing is read or written when the package is imported. The
+    configure function does the work the first time a CommandProcessor
+    is created or the Logger is used, and can be called explicitly
+    to pay the cost up front. It is idempotent and thread safe, and
+    the language file is parsed once and shared by the CommandProcessor
+    and the PronounLookupTable.
+"""
+
+# - Edit these constants to your preference or leave default - #
+
+# Default and recommended settings file configuration
+CONFIG_FILE_DIR = Path(os.path.split(os.path.abspath(__file__))[0]).parent
+CONFIG_FILE_NAME = Path('commandintegrator.settings')
+CONFIG_FILE_FULLPATH = CONFIG_FILE_DIR / CONFIG_FILE_NAME
+
+LANGUAGE_FILE_DIR = CONFIG_FILE_DIR
+LANGUAGE_FILE_NAME = Path('language.json')
+LANGUAGE_FILE_FULLPATH = LANGUAGE_FILE_DIR / LANGUAGE_FILE_NAME
+
+# Failsafe defaults
+LOG_FILE_DIR = Path('.')
+LOG_FILE_NAME = Path('commandintegrator.log')
+LOG_FILE_FULLPATH = Path('.')
+APPEND_LOGFILES = False
+CHOSEN_LANGUAGE = "en-us"
+
+settings = None
+language_file = None
+handler = None
+log = None
+
+_lock = threading.RLock()
+_settings_loaded = False
+_logging_configured = False
+_language_loaded = False
+
+
+def load_settings() -> dict:
+    """
+    Read the settings file once, falling back to the
+    failsafe defaults if it cannot be read.
+    :returns:
+        dict, the settings, or None if they could not be read
+    """
+    global settings, APPEND_LOGFILES, LOG_FILE_DIR, LOG_FILE_NAME, \
+        LOG_FILE_FULLPATH, CHOSEN_LANGUAGE, _settings_loaded
+
+    with _lock:
+        if _settings_loaded:
+            return settings
+        _settings_loaded = True
+
+        if not os.path.isfile(CONFIG_FILE_FULLPATH):
+            sys.stderr.write(f'commandintegrator: Could not find config file '
+                             f'{CONFIG_FILE_NAME} in {CONFIG_FILE_DIR}')
+        try:
+            with open(CONFIG_FILE_FULLPATH, 'r', encoding = 'utf-8') as f:
+                settings = json.loads(f.read())
+                APPEND_LOGFILES = settings['logfile_append']
+                LOG_FILE_DIR = Path(settings['log_dir'])
+                LOG_FILE_NAME = Path(settings['log_filename'])
+                CHOSEN_LANGUAGE = settings['chosen_language']
+        except Exception:
+            sys.stderr.write(f'{_cim.warn}: Could not access settings file, proceeding with defaults')
+
+        LOG_FILE_FULLPATH = LOG_FILE_DIR / LOG_FILE_NAME
+        return settings
+
+
+def configure_logging() -> logging.Logger:
+    """
+    Create the log directory and the log file handler, and
+    give the 'CI Logger' logging instance to the Logger class.
+    A logging instance already given to the Logger class with
+    logger.set_logger is kept, and nothing is created.
+    :returns:
+        logging.Logger
+    """
+    global handler, log, _logging_configured
+
+    with _lock:
+        if _logging_configured:
+            return log
+        _logging_configured = True
+        if Logger.LOG_INSTANCE is not None:
+            log = Logger.LOG_INSTANCE
+            return log
+        load_settings()
+
+        if not os.path.isdir(LOG_FILE_DIR):
+            os.mkdir(LOG_FILE_DIR)
+
+        append_switch = {True: 'a+', False: 'w'}
+        handler = logging.FileHandler(filename = LOG_FILE_FULLPATH,
+                                      encoding = 'utf-8',
+                                      mode = append_switch[APPEND_LOGFILES])
+
+        handler.setFormatter(logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+
+        log = logging.getLogger('CI Logger')
+        log.setLevel(logging.DEBUG)
+        log.addHandler(handler)
+        Logger.set_logger(log)
+        Logger.log(f'-- NEW LOGGING SESSION STARTED. DATETIME: {datetime.now()} -- ')
+        return log
+
+
+def load_language() -> dict:
+    """
+    Parse the language file once, and assign the default
+    responses to the CommandProcessor and the pronouns of
+    every language to the PronounLookupTable, with the
+    chosen language from the settings as default.
+    :returns:
+        dict, the language file, or None if it could not be loaded
+    """
+    global language_file, _language_loaded
+
+    # Imported here since the CommandProcessor configures on construction
+    from commandintegrator.core.commandprocessor import CommandProcessor
+
+    with _lock:
+        if _language_loaded:
+            return language_file
+        _language_loaded = True
+        load_settings()
+
+        try:
+            with open(LANGUAGE_FILE_FULLPATH, 'r', encoding = 'utf-8') as f:
+                language_file = json.loads(f.read())
+                pronoun_identifiers = language_file['pronoun_identifiers']
+                CommandProcessor.DEFAULT_RESPONSES = language_file['default_responses']
+                PronounLookupTable.load_languages(pronoun_identifiers, default = CHOSEN_LANGUAGE)
+        except Exception:
+            sys.stderr.write(f'{_cim.err}: Could not load pronouns for language: {CHOSEN_LANGUAGE}')
+        return language_file
+
+
+def configure() -> None:
+    """
+    Configure commandintegrator according to the settings
+    file: set up logging and load the language file.
+    Calling it more than once has no effect.
+    """
+    configure_logging()
+    load_language()
@@ -22,7 +22,10 @@ class Logger:
 
     Begin with creating the logging instance of
     choice, configuring it the way you want, then
-    pass it to the logger.set_logger method.
+    pass it to the logger.set_logger method. If no
+    instance is set when the Logger is first used,
+    the one configured from the commandintegrator
+    settings file is created and used.
 
     __verify_complete (method):
         Internal use only. Used upon importing the package
@@ -59,6 +62,18 @@ class Logger:
             sys.stderr.write('Configure an instance of logger, and'
                              ' pass it to Logger.set_logger()\r\n.')
 
+    @staticmethod
+    def get_logger():
+        """
+        Return the logging instance, configuring the
+        default one from the settings file if none is set.
+        """
+        if Logger.LOG_INSTANCE is None:
+            # Imported here to keep importing the package free of file I/O
+            from commandintegrator.core.configuration import configure_logging
+            configure_logging()
+        return Logger.LOG_INSTANCE
+
     @staticmethod
     def loggedmethod(func):
         """
@@ -80,12 +95,12 @@ class Logger:
             """
             try:
                 results = func(*args, **kwargs)
-                Logger.LOG_INSTANCE.debug(
+                Logger.get_logger().debug(
                     f'Ran method "{func.__name__}" in {func.__module__} '
                     f'with ARGS: {args} & KWARGS: {kwargs} & RETURN: {results}')
                 return results
             except Exception as e:
-                Logger.LOG_INSTANCE.error(
+                Logger.get_logger().error(
                     f'Exception occured in {func.__name__}: {e}')
                 raise e
         return inner
@@ -99,9 +114,9 @@ class Logger:
         :returns:
             arbitrary
         """
-        log_levels = {'info': lambda _message: Logger.LOG_INSTANCE.info(_message),
-                      'debug': lambda _message: Logger.LOG_INSTANCE.debug(_message),
-                      'error': lambda _message: Logger.LOG_INSTANCE.error(_message)}
+        log_levels = {'info': lambda _message: Logger.get_logger().info(_message),
+                      'debug': lambda _message: Logger.get_logger().debug(_message),
+                      'error': lambda _message: Logger.get_logger().error(_message)}
         try:
             log_levels[level](message)
         except KeyError:
@@ -1,6 +1,7 @@
 import pytz
-from datetime import datetime
+from datetime import datetime, tzinfo
 from dataclasses import dataclass
+from functools import lru_cache
 
 """
 Details:
@@ -15,13 +16,54 @@ Module details:
 """
 
 
-def is_dst(dt: datetime = datetime.now(), timezone: str = "Europe/Stockholm"):
+@lru_cache(maxsize = None)
+def get_timezone(timezone: str) -> tzinfo:
+    """
+    Return the pytz timezone by the given name. The
+    timezone, with its precomputed offsets and DST
+    transitions, is only built the first time it is
+    asked for.
+    :param timezone:
+        string, name of the timezone, "Europe/Stockholm"
+    :returns:
+        pytz timezone
+    :raises:
+        pytz.UnknownTimeZoneError
+    """
+    return pytz.timezone(timezone)
+
+
+def localize(timezone: tzinfo, dt: datetime) -> datetime:
+    """
+    Give the naive wall clock time a timezone. Times that
+    do not exist since the clock is set forward for DST
+    are moved forward by the length of the gap, and times
+    that occur twice since the clock is set back are
+    resolved to the first of them.
+    :param timezone:
+        pytz timezone
+    :param dt:
+        naive datetime object
+    :returns:
+        timezone aware datetime object
+    """
+    try:
+        return timezone.localize(dt, is_dst = None)
+    except pytz.NonExistentTimeError:
+        return timezone.normalize(timezone.localize(dt, is_dst = False))
+    except pytz.AmbiguousTimeError:
+        return timezone.localize(dt, is_dst = True)
+
+
+def is_dst(dt: datetime = None, timezone: str = "Europe/Stockholm"):
     """
     method for returning a bool whether or not a timezone
     currently is in daylight savings time, useful for servers
     that run systems outside of the user timezone.
     :param dt:
-        datetime object, default is .now()
+        datetime object, default is .now() in the timezone.
+        Naive datetime objects are taken as wall clock time
+        in the timezone.
     :param timezone:
         string, timezone to give pytz for the dst query.
         look up available timezones at this url:
@@ -29,9 +71,14 @@ def is_dst(dt: datetime = datetime.now(), timezone: str = "Europe/Stockholm"):
     :returns:
         bool
     """
-    timezone = pytz.timezone(timezone)
-    timezone_aware_date = timezone.localize(dt, is_dst = None)
-    return timezone_aware_date.tzinfo._dst.seconds != 0
+    timezone = get_timezone(timezone)
+    if dt is None:
+        timezone_aware_date = datetime.now(timezone)
+    elif dt.tzinfo is None:
+        timezone_aware_date = timezone.localize(dt, is_dst = None)
+    else:
+        timezone_aware_date = dt.astimezone(timezone)
+    return bool(timezone_aware_date.dst())
 
 @dataclass
 class _cim:
@@ -44,12 +44,16 @@ class Interpretation:
 
     error: Any exception that was caught upon parsing
     the message. 
+
+    language: The language the pronouns were identified
+    in, as assigned to the PronounLookupTable.
     """
     command_pronouns: tuple(CommandPronoun) = ()
     feature_name: str = None
     original_message: tuple = ()
     response: callable = None
     error: Exception = None
+    language: str = None
 
     def __repr__(self):
         return str(self.__dict__)
@@ -26,6 +26,20 @@ class PronounLookupTable:
     returns a tuple of matches for certain
     grammatic classes of words found in a given
     sentence. 
+
+    The pronouns assigned through assign_pronoun_identifiers
+    are compiled in to a word table, mapping each word to
+    a bitmask of the CommandPronoun classes it belongs to,
+    so that a word is identified with a single lookup. The
+    sorted result for each combination of pronouns is 
+    cached in RESULT_TABLE.
+
+    Several languages can be assigned at once, each with
+    its own word table in LANGUAGE_TABLES, and be picked
+    per lookup. The default language is found in LANGUAGE,
+    and its tables in LOOKUP_TABLE and WORD_TABLE. 
+    LANGUAGE_INDEX maps every word to the languages it
+    belongs to, used to detect the language of a message.
     """
 
     LOOKUP_TABLE = {
@@ -34,8 +48,16 @@ class PronounLookupTable:
         CommandPronoun.POSSESSIVE: tuple()
     }
 
+    WORD_TABLE: dict = {}
+    RESULT_TABLE: dict = {0: (CommandPronoun.UNIDENTIFIED,)}
+
+    LANGUAGE: str = None
+    LANGUAGE_TABLES: dict = {}
+    LANGUAGE_INDEX: dict = {}
+    _LOOKUP_TABLES: dict = {}
+
     @staticmethod
-    def lookup(message: list) -> tuple:
+    def lookup(message: list, language: str = None) -> tuple:
         """
         Split a given string by space if present, to iterate
         over a sentence of words. Returns a tuple with enum
@@ -47,38 +69,105 @@ class PronounLookupTable:
         :param message:
             list with words (string split on space) for pronoun
             identification
+        :param language:
+            str, language of the message, format: "en-us". The
+            default language is used if omitted.
         :returns:
             tuple containing identified pronouns, represented by
             Enum instance(s) of CommandPronoun.
         """
-        pronouns = []
+        if not PronounLookupTable.LANGUAGE_TABLES:
+            # Imported here to keep importing the package free of file I/O
+            from commandintegrator.core.configuration import load_language
+            load_language()
+
+        if language is None:
+            word_table = PronounLookupTable.WORD_TABLE
+        elif (word_table := PronounLookupTable.LANGUAGE_TABLES.get(language)) is None:
+            raise ValueError(f'{_cim.warn}: PronounLookupTable has no pronouns '
+                             f'assigned for language "{language}"')
 
-        for key in PronounLookupTable.LOOKUP_TABLE.keys():
-            if not len(PronounLookupTable.LOOKUP_TABLE[key]):
-                raise NotImplementedError(
-                    f'{_cim.warn}: PronounLookupTable is missing pronoun lookups. ' \
-                     'Ensure language.json is present and is valid. Use ' \
-                     'assign_pronoun_identifiers to set pronouns or refer to ' \
-                     'the documentation for commandintegrator on PronounLookupTable.'
-                )
+        if not word_table:
+            raise NotImplementedError(
+                f'{_cim.warn}: PronounLookupTable is missing pronoun lookups. ' \
+                 'Ensure language.json is present and is valid. Use ' \
+                 'assign_pronoun_identifiers to set pronouns or refer to ' \
+                 'the documentation for commandintegrator on PronounLookupTable.'
+            )
 
+        mask = 0
         for word in message:
-            for key in PronounLookupTable.LOOKUP_TABLE:
-                if word in PronounLookupTable.LOOKUP_TABLE[key]:
-                    pronouns.append(key)
+            mask |= word_table.get(word, 0)
             if '?' in word:
-                pronouns.append(CommandPronoun.INTERROGATIVE)
+                mask |= _INTERROGATIVE_BIT
+
+        try:
+            return PronounLookupTable.RESULT_TABLE[mask]
+        except KeyError:
+            pronouns = tuple(sorted(i for i in _PRONOUN_BITS if mask & _PRONOUN_BITS[i]))
+            return PronounLookupTable.RESULT_TABLE.setdefault(mask, pronouns)
 
-        if len(pronouns):
-            return tuple(sorted(set(pronouns)))
-        return (CommandPronoun.UNIDENTIFIED,)
+    @staticmethod
+    def detect_language(words) -> str:
+        """
+        Return the assigned language with the most pronouns
+        among the given words. The default language is
+        returned if no pronouns are found, or if it is
+        tied for the most pronouns.
+
+        :param words:
+            iterable with words, lowered
+        :returns:
+            str, language
+        """
+        index, counts = PronounLookupTable.LANGUAGE_INDEX, dict()
+        for word in words:
+            for language in index.get(word, ()):
+                counts[language] = counts.get(language, 0) + 1
+
+        if not counts:
+            return PronounLookupTable.LANGUAGE
+        most = max(counts.values())
+        if counts.get(PronounLookupTable.LANGUAGE) == most:
+            return PronounLookupTable.LANGUAGE
+        return next(language for language, count in counts.items() if count == most)
 
     @staticmethod
-    def assign_pronoun_identifiers(identifiers: dict, language: str) -> None:
+    def load_languages(identifiers: dict, default: str = None) -> None:
+        """
+        Assign the pronouns of every language in the
+        provided dict, structured as the "pronoun_identifiers"
+        in language.json.
+
+        :param identifiers:
+            dict, language -> pronouns, see assign_pronoun_identifiers
+        :param default:
+            str, language to use when none is given in lookups.
+            The current default is kept if omitted.
+        """
+        for language in identifiers:
+            PronounLookupTable.assign_pronoun_identifiers(identifiers, language, default = False)
+        if default is not None:
+            PronounLookupTable.set_language(default)
+
+    @staticmethod
+    def set_language(language: str) -> None:
+        """
+        Set the default language, among the assigned ones.
+        """
+        if language not in PronounLookupTable.LANGUAGE_TABLES:
+            raise ValueError(f'{_cim.warn}: PronounLookupTable has no pronouns '
+                             f'assigned for language "{language}"')
+        PronounLookupTable.LOOKUP_TABLE = PronounLookupTable._LOOKUP_TABLES[language]
+        PronounLookupTable.WORD_TABLE = PronounLookupTable.LANGUAGE_TABLES[language]
+        PronounLookupTable.LANGUAGE = language
+
+    @staticmethod
+    def assign_pronoun_identifiers(identifiers: dict, language: str, default: bool = True) -> None:
         """
         Configure the pronoun lookup table from provided
         dict, binding them to CommandPronoun enum instances
-        for fast lookups.
+        for fast lookups. Languages assigned earlier are kept.
         
         :param identifiers:
             dict, containing structure with pronouns where
@@ -87,11 +176,42 @@ class PronounLookupTable:
             Lists of words as values.
         :param language:
             str, format: "en-us", "sv-se", etcetera
+        :param default:
+            bool, make it the default language. The first
+            assigned language always becomes the default.
         :returns:
             None
+        :raises:
+            ValueError, if any of the expected keys has no words
         """
+        lookup_table = {
+            CommandPronoun.PERSONAL: tuple(identifiers[language]['personal']),
+            CommandPronoun.INTERROGATIVE: tuple(identifiers[language]['interrogative']),
+            CommandPronoun.POSSESSIVE: tuple(identifiers[language]['possessive'])
+        }
+
+        word_table = dict()
+        for pronoun, words in lookup_table.items():
+            if not len(words):
+                raise ValueError(f'{_cim.warn}: PronounLookupTable got no {pronoun.name.lower()} '
+                                 f'pronouns for language "{language}"')
+            for word in words:
+                word_table[word] = word_table.get(word, 0) | _PRONOUN_BITS[pronoun]
+
+        PronounLookupTable._LOOKUP_TABLES = {**PronounLookupTable._LOOKUP_TABLES, language: lookup_table}
+        PronounLookupTable.LANGUAGE_TABLES = {**PronounLookupTable.LANGUAGE_TABLES, language: word_table}
+
+        language_index = dict()
+        for table_language, table in PronounLookupTable.LANGUAGE_TABLES.items():
+            for word in table:
+                language_index[word] = language_index.get(word, ()) + (table_language,)
+        PronounLookupTable.LANGUAGE_INDEX = language_index
+
+        if default or PronounLookupTable.LANGUAGE is None:
+            PronounLookupTable.set_language(language)
 
-        PronounLookupTable.LOOKUP_TABLE[CommandPronoun.PERSONAL] = tuple(identifiers[language]['personal'])
-        PronounLookupTable.LOOKUP_TABLE[CommandPronoun.INTERROGATIVE] = tuple(identifiers[language]['interrogative'])
-        PronounLookupTable.LOOKUP_TABLE[CommandPronoun.POSSESSIVE] = tuple(identifiers[language]['possessive'])
 
+_PRONOUN_BITS = {pronoun: 1 << pronoun.value for pronoun in (CommandPronoun.INTERROGATIVE,
+                                                             CommandPronoun.PERSONAL,
+                                                             CommandPronoun.POSSESSIVE)}
+_INTERROGATIVE_BIT = _PRONOUN_BITS[CommandPronoun.INTERROGATIVE]
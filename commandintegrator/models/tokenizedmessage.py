@@ -0,0 +1,147 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+"""
+Details:
+    commandintegrator framework TokenizedMessage source file
+
+Module details:
+
+    The TokenizedMessage object holds the words of a
+    message in the forms that are needed while routing
+    it through the framework. It is built once by the
+    CommandProcessor for every processed message, and
+    shared by the PronounLookupTable, the command parsers
+    and the Callback objects, so that no stage has to
+    split, lower or strip the message again.
+
+    The TokenizedMessage is immutable and the message it 
+    was built from is never altered, which means that the
+    same message can be routed again, or by several 
+    CommandProcessor instances in different threads.
+"""
+
+@dataclass(frozen = True)
+class TokenizedMessage:
+    """
+    This class represents a message that has been
+    split on space characters, with the derived
+    forms of its words computed once.
+
+    Attributes that are not found on this object are
+    looked up on the message it was built from, which
+    means it can be handed to Features and interactive
+    callbacks in place of the message itself. Its
+    .content property is a list with the words of the
+    message, owned by this object and not used for
+    routing, so Features are free to alter it.
+
+    message:
+        The original message object
+    raw:
+        (tuple) The words of the message as received
+    normalized:
+        (tuple) The words lowered and stripped from
+        IGNORED_CHARS, in the same order as raw
+    positions:
+        (mappingproxy) Every normalized word mapped to a
+        tuple with the positions in which it occurs
+    """
+    IGNORED_CHARS = '?=)(/&%¤#"!,.-;:_^*`´><|'
+
+    message: object = None
+    raw: tuple = ()
+    normalized: tuple = ()
+    positions: MappingProxyType = field(default_factory = lambda: MappingProxyType({}))
+    _cache: dict = field(default_factory = dict, repr = False, compare = False)
+
+    def __getattr__(self, name: str):
+        if name.startswith('__') or name in ('message', '_cache'):
+            raise AttributeError(name)
+        return getattr(self.message, name)
+
+    @property
+    def content(self) -> list:
+        try:
+            return self._cache['content']
+        except KeyError:
+            return self._cache.setdefault('content', list(self.raw))
+
+    @property
+    def words(self):
+        """
+        The unique normalized words of the message
+        """
+        return self.positions.keys()
+
+    @classmethod
+    def from_message(cls, message: object, cache: dict = None) -> 'TokenizedMessage':
+        """
+        Build the token representation of a message,
+        splitting the .content property on space characters
+        unless it is already a collection of words.
+
+        :param message:
+            commandintegrator.Message, or another construct
+            with a .content property that is the message body
+        :param cache:
+            dict, optional word -> normalized word table that
+            is shared when many messages are tokenized in a row
+        :returns:
+            TokenizedMessage
+        """
+        content = message.content
+        if isinstance(content, str):
+            content = content.split()
+        return cls.from_words(message, content, cache)
+
+    @classmethod
+    def from_words(cls, message: object, words: list, cache: dict = None) -> 'TokenizedMessage':
+        raw = tuple(words)
+        if cache is None:
+            normalized = tuple(word.lower().strip(cls.IGNORED_CHARS) for word in raw)
+        else:
+            normalized = tuple(cache[word] if word in cache else 
+                               cache.setdefault(word, word.lower().strip(cls.IGNORED_CHARS))
+                               for word in raw)
+        positions = dict()
+        for position, word in enumerate(normalized):
+            positions.setdefault(word, []).append(position)
+        return cls(message = message,
+                   raw = raw,
+                   normalized = normalized,
+                   positions = MappingProxyType({word: tuple(indexes) for word, indexes in positions.items()}))
+
+    @staticmethod
+    def of(message: object) -> 'TokenizedMessage':
+        """
+        Return the message if it already is tokenized,
+        otherwise tokenize it.
+        """
+        if isinstance(message, TokenizedMessage):
+            return message
+        return TokenizedMessage.from_message(message)
+
+    def translate(self, table: dict) -> 'TokenizedMessage':
+        """
+        Return the tokens with every key of the table
+        replaced by its value in each word, as used with
+        the ignored_chars property of command parsers.
+        The result is cached per table, so features that
+        share the same replacements share the tokens.
+
+        :param table:
+            dict, str -> str replacements
+        :returns:
+            TokenizedMessage
+        """
+        key = ('translation', tuple(table.items()))
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        words = self.raw
+        for old, new in key[1]:
+            words = [word.replace(old, new) for word in words]
+        translated = TokenizedMessage.from_words(self.message, words)
+        return self._cache.setdefault(key, translated)
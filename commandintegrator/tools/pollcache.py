@@ -14,6 +14,39 @@ Module details:
     the most recent one.
 """
 
+import asyncio
+import functools
+import hashlib
+import inspect
+import itertools
+import json
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterable, Iterator, Tuple
+
+import commandintegrator
+
+
+class _Unhashable:
+    """
+    Marks the keys of the caches with arguments
+    that can not be hashed
+    """
+
+
+class _Removed:
+    """
+    Value of the keys removed from a dict, in the
+    changes returned with compare="diff"
+    """
+
+    def __repr__(self):
+        return "PollCache.REMOVED"
+
 
 class PollCache:
     """
@@ -31,6 +64,43 @@ class PollCache:
     overwritten in the PollCache just because the function is 
     the same, but will be treated as its own cache.
 
+    Each cache is found by a key made from the function
+    and a hashable form of its arguments, where lists, 
+    tuples, dicts and sets are compared by their content,
+    so polling one function with many sets of arguments 
+    stays fast. Arguments that can not be hashed at all
+    are compared one by one instead.
+
+    The caches can be bounded by their amount, by their
+    estimated size in bytes, and by a ttl in seconds since
+    they were last polled. The least recently polled caches
+    are evicted first. A poll of an evicted cache is treated
+    as a first call. The hits, misses, changes and evictions
+    are counted, see 'stats'.
+
+    Many functions can be polled at once with poll_many,
+    on a thread pool, or with apoll_many from a coroutine.
+    A function with the same arguments is never polled by
+    two threads or tasks at once, the second one waits.
+
+    :compare:
+        How results are compared to the cached one:
+        "value":  the result is kept and compared with ==,
+                  which is the default.
+        "digest": only a blake2b digest of the result as
+                  canonical JSON is kept and compared, so
+                  large results are neither kept in memory
+                  nor compared deeply. Results should be
+                  made of JSON types, others are digested
+                  by their repr.
+        "diff":   as "value", but only what changed is
+                  returned: the added and changed keys of
+                  dicts, recursively, with removed keys as
+                  PollCache.REMOVED, and the added and removed
+                  items of lists, as {"added": [...],
+                  "removed": [...]}, see PollCache.diff.
+                  Other results are returned whole.
+
     This class uses the __call__ method as its main interface.
     Call the instance of this class as you would a function.
 
@@ -63,37 +133,500 @@ class PollCache:
     >>    cache(function, a = 10, b = 20) #  Will produce a return value (new output)
     """
     
-    def __init__(self, silent_first_call = False):
-        self.cached_polls = dict()
+    compare_modes = ("value", "digest", "diff")
+    REMOVED = _Removed()
+
+    def __init__(self, silent_first_call = False, max_entries: int = None,
+                 max_bytes: int = None, ttl: float = None, compare: str = "value"):
+        """
+        :param max_entries: int, most caches kept
+        :param max_bytes: int, most bytes kept in the caches,
+                          by the estimated size of their
+                          arguments and results
+        :param ttl: float, seconds a cache is kept without
+                    being polled
+        :param compare: str, "value", "digest" or "diff"
+        """
+        if compare not in self.compare_modes:
+            raise ValueError(f"'{compare}' is an invalid value for 'compare'")
+        self.compare = compare
+        self.cached_polls = OrderedDict()
         self.silent_first_call = silent_first_call
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.changes = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lock = threading.RLock()
+        self._key_locks = dict()
+        self._key_waiters = dict()
+        self._unhashable_polls = dict()
+        self._unhashable_keys = itertools.count()
 
-    def __call__(self, func: 'function', *args, **kwargs):
+    def __len__(self):
+        return len(self.cached_polls)
+
+    @property
+    def stats(self) -> dict:
+        """
+        hits:      polls of a cache that was kept
+        misses:    polls without a kept cache, the first
+                   one and those delay the cache was evicted
+        changes:   hits where the result had changed
+        evictions: caches dropped by the limits or the ttl
+        errors:    polls in poll_many and apoll_many that raised
+        entries:   caches kept
+        bytes:     estimated size of the caches, counted
+                   only with a max_bytes
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'changes': self.changes,
+                'evictions': self.evictions,
+                'errors': self.errors,
+                'entries': len(self.cached_polls),
+                'bytes': self.size}
+
+    @staticmethod
+    def _freeze(obj) -> object:
+        """
+        Return a hashable equivalent of obj, where
+        containers are replaced with tuples and frozensets
+        tagged with their type, so that equal arguments
+        give equal keys.
+        :raises:
+            TypeError, if obj holds an unhashable object
+            that is not a list, tuple, dict or set
+        """
+        if isinstance(obj, (str, bytes, int, float, type(None))):
+            return obj
+        if isinstance(obj, dict):
+            return dict, frozenset((key, PollCache._freeze(value)) for key, value in obj.items())
+        if isinstance(obj, (list, tuple)):
+            return type(obj), tuple(PollCache._freeze(i) for i in obj)
+        if isinstance(obj, (set, frozenset)):
+            return frozenset, frozenset(obj)
+        hash(obj)
+        return obj
+
+    def key(self, func: 'function', args: tuple, kwargs: dict):
+        """
+        Return the key of the func with the args and kwargs
+        in cached_polls, or None if the arguments can not
+        be hashed.
+        """
+        try:
+            return func, self._freeze(args), self._freeze(kwargs)
+        except TypeError:
+            return None
+
+    def _entry(self, func: 'function', args: tuple, kwargs: dict) -> dict:
+        """
+        Find the entry of arguments that can not be hashed,
+        comparing them one by one as a fallback.
+        """
+        for call in self._unhashable_polls.get(func, ()):
+            if call['args'] == args and call['kwargs'] == kwargs:
+                return call
+        return None
+
+    @staticmethod
+    def _sizeof(obj, seen: set = None) -> int:
+        """
+        Estimate the size of obj in bytes, with the
+        contents of lists, tuples, sets and dicts.
+        """
+        if seen is None:
+            seen = set()
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            size += sum(PollCache._sizeof(key, seen) + PollCache._sizeof(value, seen)
+                        for key, value in obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            size += sum(PollCache._sizeof(i, seen) for i in obj)
+        return size
+
+    def _measure(self, call: dict) -> None:
+        if self.max_bytes is not None:
+            size = self._sizeof((call['args'], call['kwargs'], call['result']))
+            self.size += size - call['size']
+            call['size'] = size
+
+    def _remove(self, key) -> None:
+        call = self.cached_polls.pop(key)
+        self.size -= call['size']
+        if key[0] is _Unhashable:
+            calls = self._unhashable_polls[call['func']]
+            calls.remove(call)
+            if not calls:
+                del self._unhashable_polls[call['func']]
+        self.evictions += 1
+
+    def evict(self) -> None:
+        """
+        Drop the least recently polled caches while the
+        limits are exceeded, and those that have not been
+        polled within the ttl. The most recent cache is
+        kept, even if it exceeds max_bytes on its own.
+        """
+        with self._lock:
+            if self.ttl is not None:
+                expired = time.monotonic() - self.ttl
+                while self.cached_polls and next(iter(self.cached_polls.values()))['polled'] <= expired:
+                    self._remove(next(iter(self.cached_polls)))
+            while len(self.cached_polls) > 1 and \
+                    (self.max_entries is not None and len(self.cached_polls) > self.max_entries or
+                     self.max_bytes is not None and self.size > self.max_bytes):
+                self._remove(next(iter(self.cached_polls)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cached_polls.clear()
+            self._unhashable_polls.clear()
+            self.size = 0
+
+    @staticmethod
+    def _canonical(obj):
+        if isinstance(obj, (set, frozenset)):
+            return sorted(obj, key=repr)
+        if isinstance(obj, tuple):
+            return list(obj)
+        return repr(obj)
+
+    @staticmethod
+    def digest(result) -> bytes:
+        """
+        blake2b digest of the result as canonical JSON,
+        with sorted keys, the same for equal results.
+        """
+        try:
+            dump = json.dumps(result, sort_keys=True, separators=(',', ':'),
+                              default=PollCache._canonical)
+        except TypeError:
+            # Keys of mixed types can not be sorted
+            dump = repr(result)
+        return hashlib.blake2b(dump.encode(), digest_size=16).digest()
+
+    @staticmethod
+    def _missing(items: list, others: list) -> list:
+        """
+        The items that are not in others, counting
+        equal items, so that a duplicate is missing
+        when others has fewer of it.
+        """
         try:
-            new_result = func(*args, **kwargs)
-        except:
-            raise
-
-        if not func in self.cached_polls.keys():            
-            self.cached_polls[func] = [
-                {'args': args,
-                 'kwargs': kwargs,
-                 'result': new_result,
-                 'calls': 1}]
-            
-            return new_result if not self.silent_first_call else None
-
-        for call in self.cached_polls[func]:
-            if call['args'] == args and call['kwargs'] == kwargs and call['result'] != new_result:
-                call['result'] = new_result
+            remaining = Counter(PollCache._freeze(i) for i in others)
+            missing = []
+            for item in items:
+                if remaining[frozen := PollCache._freeze(item)]:
+                    remaining[frozen] -= 1
+                else:
+                    missing.append(item)
+            return missing
+        except TypeError:
+            remaining, missing = list(others), []
+            for item in items:
+                if item in remaining:
+                    remaining.remove(item)
+                else:
+                    missing.append(item)
+            return missing
+
+    @staticmethod
+    def diff(old, new):
+        """
+        What changed from old to new: the added and changed
+        keys of dicts, recursively, with removed keys as
+        REMOVED, and for lists a dict of the items that were
+        "added" and "removed". When the items of a list were
+        only reordered, the dict holds the list in its new
+        "order" instead. Other values are returned as they are.
+        """
+        if isinstance(old, dict) and isinstance(new, dict):
+            changes = {key: PollCache.diff(old[key], value) if key in old else value
+                       for key, value in new.items()
+                       if key not in old or old[key] != value}
+            changes.update((key, PollCache.REMOVED) for key in old if key not in new)
+            return changes
+        if isinstance(old, list) and isinstance(new, list):
+            added, removed = PollCache._missing(new, old), PollCache._missing(old, new)
+            if not added and not removed:
+                return {'order': new}
+            return {'added': added, 'removed': removed}
+        return new
+
+    def __call__(self, func: 'function', *args, **kwargs):
+        key = self.key(func, args, kwargs)
+        with self._polling(func if key is None else key):
+            return self._update(func, args, kwargs, key, func(*args, **kwargs))
+
+    def check(self, func: 'function', result, *args, **kwargs):
+        """
+        Compare a result of func with the args and kwargs,
+        obtained elsewhere, to the cache, as if func had
+        been polled.
+        :returns: what the poll would have given
+        """
+        return self._update(func, args, kwargs, self.key(func, args, kwargs), result)
+
+    def _update(self, func: 'function', args: tuple, kwargs: dict, key, new_result):
+        """
+        Compare the result of a poll to the cache,
+        and return what the poll gives.
+        """
+        kept = self.digest(new_result) if self.compare == "digest" else new_result
+        with self._lock:
+            self.evict()
+
+            if key is not None:
+                call = self.cached_polls.get(key)
+            else:
+                call = self._entry(func, args, kwargs)
+
+            if call is None:
+                self.misses += 1
+                call = {'args': args,
+                        'kwargs': kwargs,
+                        'result': kept,
+                        'calls': 1,
+                        'size': 0,
+                        'polled': time.monotonic()}
+                if key is None:
+                    key = _Unhashable, next(self._unhashable_keys)
+                    call['func'] = func
+                    self._unhashable_polls.setdefault(func, []).append(call)
+                call['key'] = key
+                self.cached_polls[key] = call
+                self._measure(call)
+                self.evict()
+                return new_result if not self.silent_first_call else None
+
+            self.hits += 1
+            self.cached_polls.move_to_end(call['key'])
+            # Kept without a ttl as well, which may be set later
+            call['polled'] = time.monotonic()
+
+            if call['result'] != kept:
+                self.changes += 1
+                if self.compare == "diff":
+                    changes = self.diff(call['result'], new_result)
+                call['result'] = kept
                 call['calls'] += 1
-                return new_result
-                
-        if not [i for i in self.cached_polls[func] if i['args'] == args and i['kwargs'] == kwargs]:
-            self.cached_polls[func].append({
-                'args': args, 
-                'kwargs': kwargs, 
-                'result': new_result, 
-                'calls': 1})
-            
-            return new_result if not self.silent_first_call else None
+                self._measure(call)
+                self.evict()
+                return changes if self.compare == "diff" else new_result
+
+    def _hold(self, key) -> threading.Lock:
+        """
+        The lock of the key, counting the caller as one
+        of its users until _drop is called. The locks are
+        dropped when no thread or task holds or waits for
+        them. Arguments that can not be hashed share the
+        lock of their function.
+        """
+        with self._lock:
+            lock, users = self._key_locks.get(key, (None, 0))
+            self._key_locks[key] = (lock := lock or threading.Lock()), users + 1
+        return lock
+
+    def _drop(self, key) -> None:
+        with self._lock:
+            lock, users = self._key_locks[key]
+            if users == 1:
+                del self._key_locks[key]
+            else:
+                self._key_locks[key] = lock, users - 1
+
+    def _release(self, key, lock: threading.Lock) -> None:
+        """
+        Release the lock of the key, and wake the tasks
+        waiting for it. Threads are woken by the lock.
+        """
+        lock.release()
+        with self._lock:
+            waiters = self._key_waiters.pop(key, ())
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._wake, future)
+
+    @staticmethod
+    def _wake(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(None)
+
+    @contextmanager
+    def _polling(self, key):
+        """
+        Hold the lock of the key while it is polled, so
+        that it is not polled twice at once, by threads
+        or by tasks, see _apolling.
+        """
+        lock = self._hold(key)
+        try:
+            lock.acquire()
+            try:
+                yield
+            finally:
+                self._release(key, lock)
+        finally:
+            self._drop(key)
+
+    @asynccontextmanager
+    async def _apolling(self, key):
+        """
+        Coroutine counterpart of _polling, with the same
+        locks. A task waits for a lock that is held on a
+        future, which is woken when the lock is released,
+        so that neither the event loop nor the threads of
+        its executor are blocked meanwhile.
+        """
+        lock = self._hold(key)
+        try:
+            loop = asyncio.get_running_loop()
+            while not lock.acquire(blocking=False):
+                future = loop.create_future()
+                with self._lock:
+                    self._key_waiters.setdefault(key, []).append((loop, future))
+                # Released before the waiter was added
+                if lock.acquire(blocking=False):
+                    self._forget(key, loop, future)
+                    break
+                try:
+                    await future
+                finally:
+                    self._forget(key, loop, future)
+            try:
+                yield
+            finally:
+                self._release(key, lock)
+        finally:
+            self._drop(key)
 
+    def _forget(self, key, loop, future: asyncio.Future) -> None:
+        with self._lock:
+            if (waiters := self._key_waiters.get(key)) and (loop, future) in waiters:
+                waiters.remove((loop, future))
+                if not waiters:
+                    del self._key_waiters[key]
+
+    async def acall(self, func: 'function', *args, **kwargs):
+        """
+        Coroutine counterpart of calling the PollCache.
+        Coroutine functions are awaited, other functions
+        are called in the default executor of the loop.
+        """
+        key = self.key(func, args, kwargs)
+        async with self._apolling(func if key is None else key):
+            if inspect.iscoroutinefunction(func):
+                new_result = await func(*args, **kwargs)
+            else:
+                new_result = await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(func, *args, **kwargs))
+            return self._update(func, args, kwargs, key, new_result)
+
+    @staticmethod
+    def _unpack(poll) -> tuple:
+        """
+        :param poll: a function, or a tuple of a function and
+                     optionally a tuple of args and a dict of kwargs
+        :returns: tuple, func, args and kwargs
+        """
+        if callable(poll):
+            return poll, (), {}
+        func, args, kwargs = (*poll, (), {})[:3]
+        return func, tuple(args), dict(kwargs)
+
+    def _poll_failed(self, func: 'function', e: Exception) -> None:
+        with self._lock:
+            self.errors += 1
+        commandintegrator.logger.log(f"PollCache could not poll "
+                                     f"'{getattr(func, '__name__', func)}': "
+                                     f"{type(e).__name__}('{e}')", level="error")
+
+    def _poll(self, poll):
+        func, args, kwargs = self._unpack(poll)
+        try:
+            return self(func, *args, **kwargs)
+        except Exception as e:
+            self._poll_failed(func, e)
+            return None
+
+    def poll_many(self, polls: Iterable, max_workers: int = None,
+                  timeout: float = None) -> Iterator[Tuple[Any, Any]]:
+        """
+        Poll many functions at once on a thread pool, and
+        yield what each poll gives, as the polls complete,
+        leaving out the polls that gave None. Polls that
+        raise are logged and counted as errors in 'stats'.
+
+        >>    polls = [(api.get, ("/users",)), (api.get, ("/posts",), {"page": 2})]
+        >>    for poll, result in cache.poll_many(polls):
+        >>        ...
+
+        :param polls: iterable of functions, or tuples of a
+                      function and optionally a tuple of args
+                      and a dict of kwargs
+        :param max_workers: int, most polls made at once,
+                            one per poll up to 32 if omitted
+        :param timeout: float, seconds to wait for the polls
+        :returns: iterator of tuples, the poll as given and
+                  what it gave
+        :raises: concurrent.futures.TimeoutError, if the
+                 timeout passes
+        """
+        if not (polls := list(polls)):
+            return
+        executor = ThreadPoolExecutor(max_workers or min(len(polls), 32),
+                                      thread_name_prefix="PollCache")
+        futures = {executor.submit(self._poll, poll): poll for poll in polls}
+        try:
+            for future in as_completed(futures, timeout):
+                if (result := future.result()) is not None:
+                    yield futures[future], result
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    async def apoll_many(self, polls: Iterable, limit: int = None) -> AsyncIterator[Tuple[Any, Any]]:
+        """
+        Coroutine counterpart of poll_many, as an async
+        generator. Coroutine functions are awaited, other
+        functions are called in the default executor of
+        the loop.
+
+        >>    async for poll, result in cache.apoll_many(polls):
+        >>        ...
+
+        :param polls: see poll_many
+        :param limit: int, most polls made at once. No
+                      limit if omitted.
+        """
+        semaphore = asyncio.Semaphore(limit) if limit else None
+
+        async def poll(item):
+            func, args, kwargs = self._unpack(item)
+            try:
+                if semaphore is None:
+                    return item, await self.acall(func, *args, **kwargs)
+                async with semaphore:
+                    return item, await self.acall(func, *args, **kwargs)
+            except Exception as e:
+                self._poll_failed(func, e)
+                return item, None
+
+        tasks = [asyncio.ensure_future(poll(item)) for item in polls]
+        try:
+            for done in asyncio.as_completed(tasks):
+                item, result = await done
+                if result is not None:
+                    yield item, result
+        finally:
+            for task in tasks:
+                task.cancel()
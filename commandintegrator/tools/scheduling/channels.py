@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from queue import Empty
+from typing import Any, List
+
+
+@dataclass(frozen=True)
+class JobOutput:
+    """
+    The output of an execution of a Job, as put in an
+    OutputChannel when the Job has no recipient.
+
+    job_id:       native_id of the Job
+    name:         func_name of the Job
+    key:          key of the Job
+    result:       what the function of the Job returned
+    run:          amount of times the Job had been triggered
+    triggered_at: when the Job was triggered for the execution
+    created:      when the execution returned
+    """
+    job_id: int
+    name: str
+    key: str
+    result: Any
+    run: int
+    triggered_at: datetime = None
+    created: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def of(cls, job) -> 'JobOutput':
+        return cls(job_id=job.native_id, name=job.func_name, key=job.key,
+                   result=job.result, run=job.trigger.amount_of_runs,
+                   triggered_at=job.trigger.last_trigger)
+
+
+class OutputChannel:
+    """
+    OutputChannel class
+
+    Bounded channel for the outputs of Jobs. When the
+    channel is full, the policy decides what happens
+    to a new output:
+
+        "drop_oldest": the oldest output in the channel
+                       is dropped to make room
+        "drop_newest": the new output is dropped
+        "block":       the Job waits for room, at most
+                       'timeout' seconds, delay which the
+                       new output is dropped. This slows
+                       down the Jobs to the pace of the
+                       consumer.
+
+    Outputs are taken with get, which can be blocking
+    or not, all at once with drain, or from a coroutine
+    with aget or 'async for'.
+    """
+    policies = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(self, maxsize: int = 1000, policy: str = "drop_oldest",
+                 timeout: float = None):
+        """
+        :param maxsize: int, most outputs kept in the channel
+        :param policy: str, "drop_oldest", "drop_newest" or "block"
+        :param timeout: float, seconds a Job waits for room with
+                        the "block" policy. No limit if omitted.
+        """
+        if policy not in self.policies:
+            raise ValueError(f"'{policy}' is an invalid value for 'policy'")
+        if maxsize < 1:
+            raise ValueError("'maxsize' must be at least 1")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._waiters = []
+
+    def __repr__(self):
+        return f"OutputChannel(" \
+               f"size={len(self._items)}, " \
+               f"maxsize={self.maxsize}, " \
+               f"policy={self.policy}, " \
+               f"dropped={self.dropped})"
+
+    def __len__(self):
+        return len(self._items)
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def put(self, item) -> bool:
+        """
+        Put an output in the channel.
+        :returns: bool, False if an output was dropped
+                  to make room or the new one was dropped
+        """
+        with self._lock:
+            kept = True
+            if len(self._items) >= self.maxsize:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                    kept = False
+                elif not self._not_full.wait_for(lambda: len(self._items) < self.maxsize,
+                                                 self.timeout):
+                    self.dropped += 1
+                    return False
+            self._items.append(item)
+            self._not_empty.notify()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._wake, future)
+        return kept
+
+    @staticmethod
+    def _wake(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(None)
+
+    def get(self, block: bool = True, timeout: float = None):
+        """
+        Take the oldest output from the channel.
+        :param block: bool, wait for an output if the
+                      channel is empty
+        :param timeout: float, seconds to wait at most
+        :raises: queue.Empty, if no output was available
+        """
+        with self._lock:
+            if block:
+                if not self._not_empty.wait_for(lambda: self._items, timeout):
+                    raise Empty
+            elif not self._items:
+                raise Empty
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def drain(self, max_items: int = None) -> List:
+        """
+        Take every output in the channel at once, or at
+        most max_items of them, without blocking.
+        :returns: list, oldest output first
+        """
+        with self._lock:
+            amount = len(self._items) if max_items is None else min(max_items, len(self._items))
+            items = [self._items.popleft() for _ in range(amount)]
+            self._not_full.notify(amount)
+            return items
+
+    async def aget(self, timeout: float = None):
+        """
+        Coroutine counterpart of get, which waits for an
+        output without blocking the event loop.
+        :raises: asyncio.TimeoutError, if the timeout passes
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if self._items:
+                    item = self._items.popleft()
+                    self._not_full.notify()
+                    return item
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                await asyncio.wait_for(future, remaining)
+            finally:
+                with self._lock:
+                    if (loop, future) in self._waiters:
+                        self._waiters.remove((loop, future))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.aget()
@@ -1,11 +1,23 @@
 import asyncio
+import functools
 import inspect
+import itertools
+import json
+import random
+import re
+import threading
 import time
 from typing import Callable
-from datetime import datetime, timedelta
-from threading import Thread
+from datetime import datetime, timedelta, tzinfo
+
+import pytz
 
 import commandintegrator
+from commandintegrator.core.internals import get_timezone, localize
+from commandintegrator.tools.scheduling.cron import CronExpression
+from commandintegrator.tools.scheduling.metrics import SchedulerMetrics
+from commandintegrator.tools.scheduling.retry import RetryPolicy
+from commandintegrator.tools.scheduling.jobstore import JobRecord, JobStore, reference, encode
 
 
 class TimeTrigger:
@@ -17,8 +29,28 @@ class TimeTrigger:
     and units of time. It can be set to trigger
     at a certain time, delay a certain amount of time
     has passed, be a recurring trigger with a defined
-    interval of delay.
+    interval of delay, or follow a cron expression.
+
+    Without a timezone, the rules are in the naive local
+    time of the system. With a timezone, 'at', the days
+    and cron expressions follow the wall clock of the
+    timezone, so that daily jobs keep their time of day
+    across DST changes. Wall clock times skipped when the
+    clock is set forward are moved forward by the gap, and
+    times repeated when it is set back only trigger once.
+    Intervals are exact amounts of time regardless.
 
+    Each reset also computes a deadline on the monotonic
+    clock, which is what is_pulled and the engines compare
+    against, so no timezone conversion is made when the
+    trigger is evaluated and it is not affected by the
+    system clock being adjusted.
+
+    The next trigger is computed directly from the
+    rules and the current time when the TimeTrigger
+    is reset, rather than by stepping towards it.
+    Points in time that were missed while the trigger
+    was not pulled, are coalesced into the next one.
     """
     timeformat = "%H:%M:%S"
     day_int = {
@@ -38,13 +70,36 @@ class TimeTrigger:
         "second": timedelta(seconds=1),
     }
 
+    interval_units = {
+        "ms": timedelta(milliseconds=1),
+        "millisecond": timedelta(milliseconds=1),
+        "s": timedelta(seconds=1),
+        "sec": timedelta(seconds=1),
+        "second": timedelta(seconds=1),
+        "m": timedelta(minutes=1),
+        "min": timedelta(minutes=1),
+        "minute": timedelta(minutes=1),
+        "h": timedelta(hours=1),
+        "hour": timedelta(hours=1),
+        "d": timedelta(days=1),
+        "day": timedelta(days=1),
+        "w": timedelta(weeks=1),
+        "week": timedelta(weeks=1),
+    }
+
+    catch_up_policies = ("skip", "once", "all")
+
+    interval_pattern = re.compile(r"^(?:every\s+)?(\d+(?:\.\d+)?)\s*([a-z]+)$")
+
     def __init__(self, at: str=None, every: str=None,
-                 delay=None, exactly_at: datetime=None):
+                 delay=None, exactly_at: datetime=None,
+                 cron: str=None, jitter: float=None,
+                 timezone: str=None):
         """
         Configures the TimeTrigger object according
         to provided arguments.
 
-        :param every: str, a day, every day or timeunit.
+        :param every: str, a day, every day, timeunit or interval.
             Valid parameters:
                 "day"
                 "monday"
@@ -57,6 +112,11 @@ class TimeTrigger:
                 "hour"
                 "minute"
                 "second"
+            Intervals are an amount followed by a unit,
+            such as "250ms", "15 minutes" or "1.5h". Valid
+            units are ms, s, m, h, d and w, in short or in
+            full, singular or plural. A timedelta is also
+            accepted.
         :param at: str, time of scheduling.
                   Valid in HH:MM:SS format or HH:MM format.
                   Example: "10:00" or "10:00:22". Seconds (SS)
@@ -68,16 +128,50 @@ class TimeTrigger:
                            object is created outside by the creator
                            for a specific day and time when the job
                            is to be run.
+        :param cron: str, cron expression such as "*/15 9-17 * * mon-fri",
+                     see CronExpression. Can not be combined with
+                     the other rules.
+        :param jitter: float, the TimeTrigger is pulled at a random
+                       point within this many seconds delay each
+                       computed point in time. The jitter does not
+                       accumulate over reoccurring triggers.
+        :param timezone: str, name of the timezone of the rules,
+                         "Europe/Stockholm" for instance, or a pytz
+                         timezone. next_trigger and last_trigger are
+                         then timezone aware.
         """
+        # The arguments, for the TimeTrigger to be recreated by a JobStore
+        self.rules = dict(at=at, every=every, delay=delay, exactly_at=exactly_at,
+                          cron=cron, jitter=jitter, timezone=timezone)
+        if isinstance(timezone, str):
+            timezone = get_timezone(timezone)
+        self.timezone: tzinfo = timezone
         self.amount_of_runs = 0
-        self.next_trigger: datetime = datetime.now()
+        self.next_trigger: datetime = self._wall_clock_now()
+        self.deadline: float = None
         self.last_trigger: datetime = None
         self.reoccurring: bool = False
         self.timedelta_interval: timedelta = None
         self.days_to_run: tuple[int] = None
         self.delay = None
+        self.cron: CronExpression = None
+        self.jitter = jitter
+        self._catch_up = 0
+
+        if jitter is not None and jitter < 0:
+            raise ValueError("'jitter' can not be negative")
+
+        if cron:
+            if any((at, every, delay, exactly_at)):
+                raise ValueError("'cron' can not be combined with "
+                                 "'every', 'at', 'delay' or 'exactly_at'")
+            self.cron = cron if isinstance(cron, CronExpression) else CronExpression(cron)
+            self.reoccurring = True
 
         if exactly_at:
+            if exactly_at.tzinfo is not None:
+                # Expressed as wall clock time in the timezone of the rules
+                exactly_at = exactly_at.astimezone(self.timezone).replace(tzinfo=None)
             self.next_trigger = exactly_at
         if at:
             at = self.__validate_timestring(at)
@@ -85,7 +179,8 @@ class TimeTrigger:
             self.next_trigger = self.next_trigger.replace(
                 hour=parsed_time.hour,
                 minute=parsed_time.minute,
-                second=parsed_time.second)
+                second=parsed_time.second,
+                microsecond=0)
         elif delay:
             delay = self.__validate_timestring(delay)
             parsed_time = datetime.strptime(delay, self.timeformat)
@@ -94,22 +189,31 @@ class TimeTrigger:
                                    seconds=parsed_time.second)
         if every:
             self.reoccurring = True
-            if not (_repeat_every := self.day_int.get(every)):
+            if isinstance(every, timedelta):
+                _repeat_every = every
+            elif not (_repeat_every := self.day_int.get(every)):
                 if not (_repeat_every := self.timeunits.get(every)):
-                    raise ValueError(
-                        f"'{every}' is an invalid value for 'every'")
+                    _repeat_every = self.__parse_interval(every)
             if isinstance(_repeat_every, tuple):
                 # It's a day of week, or every day in the week
                 self.days_to_run = _repeat_every
             elif isinstance(_repeat_every, timedelta):
-                # It's every minute, hour or second
+                # It's every minute, hour, second or an interval
+                if _repeat_every <= timedelta(0):
+                    raise ValueError(f"'{every}' is an invalid value for 'every'")
                 self.timedelta_interval = _repeat_every
 
-        if not any((at, every, delay, exactly_at)):
+        if not any((at, every, delay, exactly_at, cron)):
             raise AttributeError("TimeTrigger needs at least one rule "
                                  "for scheduling: 'every', 'at', 'delay', "
-                                 "'exactly_at'")
+                                 "'exactly_at', 'cron'")
 
+        # The point in time given by the rules, without jitter.
+        # Naive wall clock time, or naive UTC for intervals in
+        # a timezone, see _now.
+        self._slot: datetime = self.next_trigger
+        if self.timezone is not None and self.timedelta_interval:
+            self._slot = localize(self.timezone, self._slot).astimezone(pytz.utc).replace(tzinfo=None)
         self.reset()
 
     def __repr__(self):
@@ -126,12 +230,69 @@ class TimeTrigger:
             return f"{timestr}:00"
         return timestr
 
+    @classmethod
+    def __parse_interval(cls, every: str) -> timedelta:
+        match = cls.interval_pattern.match(every.strip().lower())
+        unit = None
+        if match:
+            # "ms" and "s" are units of their own, others may be plural
+            name = match.group(2)
+            unit = cls.interval_units.get(name) or cls.interval_units.get(name.rstrip("s"))
+        if not unit:
+            raise ValueError(f"'{every}' is an invalid value for 'every'")
+        return unit * float(match.group(1))
+
+    @classmethod
+    def parse_interval(cls, every) -> timedelta:
+        """
+        The timedelta of an interval given as to 'every',
+        such as "minute", "15 minutes" or a timedelta
+        """
+        if isinstance(every, timedelta):
+            return every
+        return cls.timeunits.get(every) or cls.__parse_interval(every)
+
+    @property
+    def slot(self) -> datetime:
+        """
+        The point in time given by the rules for the
+        next trigger, without jitter
+        """
+        return self._slot
+
+    def _wall_clock_now(self) -> datetime:
+        if self.timezone is None:
+            return datetime.now()
+        return datetime.now(self.timezone).replace(tzinfo=None)
+
+    def _now(self) -> datetime:
+        """
+        The current time, in the same frame as self._slot
+        """
+        if self.timezone is not None and self.timedelta_interval:
+            return datetime.now(pytz.utc).replace(tzinfo=None)
+        return self._wall_clock_now()
+
+    def _resolve(self, slot: datetime) -> datetime:
+        """
+        The point in time of the slot, timezone aware
+        if the TimeTrigger has a timezone
+        """
+        if self.timezone is None:
+            return slot
+        if self.timedelta_interval:
+            return pytz.utc.localize(slot).astimezone(self.timezone)
+        return localize(self.timezone, slot)
+
     def is_pulled(self):
-        if datetime.now() >= self.next_trigger:
-            if self.reoccurring:
+        if time.monotonic() >= self.deadline:
+            if self._catch_up:
+                # Stay due for the next of the missed firings
+                self._catch_up -= 1
+            elif self.reoccurring:
                 self.reset()
             self.amount_of_runs += 1
-            self.last_trigger = datetime.now()
+            self.last_trigger = datetime.now(self.timezone)
             return True
         return False
 
@@ -146,123 +307,533 @@ class TimeTrigger:
         self.next_trigger.
 
         If a timedelta is the configured interval,
-        the self.next_trigger will be mutated with
-        this value.
+        the self.next_trigger will be advanced by
+        as many intervals as it takes to pass the
+        current time, and at least one.
+
+        If a cron expression is configured, the next
+        point in time matching it is computed.
+
+        The deadline on the monotonic clock is
+        computed along with self.next_trigger.
         :returns: None
         """
-        if self.days_to_run:
-            if datetime.now() >= self.next_trigger:
-                self.next_trigger += timedelta(days=1)
-            while not self.next_trigger.weekday() in self.days_to_run:
-                self.next_trigger += timedelta(days=1)
+        now = self._now()
+        if self.cron:
+            self._slot = self.cron.next_after(max(now, self._slot))
+        elif self.days_to_run:
+            if now >= self._slot:
+                self._slot += timedelta(days=(now - self._slot).days + 1)
+            self._slot += timedelta(days=min((day - self._slot.weekday()) % 7
+                                             for day in self.days_to_run))
         elif self.timedelta_interval:
-            self.next_trigger += self.timedelta_interval
+            intervals = max((now - self._slot) // self.timedelta_interval + 1, 1)
+            self._slot += self.timedelta_interval * intervals
         if self.delay:
-            self.next_trigger += self.delay
+            self._slot += self.delay
+        self._arm()
+
+    def set_interval(self, interval: timedelta) -> None:
+        """
+        Change the interval of a TimeTrigger with an
+        interval. The next trigger is moved to one new
+        interval delay the last one, which is right away
+        if that has passed already.
+        :param interval: timedelta
+        """
+        if not self.timedelta_interval:
+            raise ValueError("only the interval of a TimeTrigger with "
+                             "an interval in 'every' can be changed")
+        if interval <= timedelta(0):
+            raise ValueError(f"'{interval}' is an invalid interval")
+        self._slot += interval - self.timedelta_interval
+        self.timedelta_interval = interval
+        self._arm()
+
+    def _arm(self, next_trigger: datetime = None) -> None:
+        """
+        Set self.next_trigger to the point in time of
+        self._slot with jitter, or to the given one, and
+        compute the deadline on the monotonic clock.
+        """
+        if next_trigger is not None:
+            self.next_trigger = next_trigger
+            self.deadline = time.monotonic() + \
+                (next_trigger - datetime.now(next_trigger.tzinfo)).total_seconds()
+            return
+
+        next_trigger = self._resolve(self._slot)
+        if self.jitter:
+            next_trigger += timedelta(seconds=random.uniform(0, self.jitter))
+        if self.timezone is not None:
+            next_trigger = self.timezone.normalize(next_trigger)
+        self.next_trigger = next_trigger
+        self.deadline = time.monotonic() + \
+            (next_trigger - datetime.now(self.timezone)).total_seconds()
+
+    def _missed_slots(self, since: datetime, now: datetime) -> int:
+        """
+        The amount of points in time given by the rules
+        from the slot 'since' up until now, both included.
+        """
+        if since > now:
+            return 0
+        if self.timedelta_interval:
+            return (now - since) // self.timedelta_interval + 1
+        if not self.reoccurring:
+            return 1
+        missed, slot = 0, since
+        while slot <= now:
+            missed += 1
+            if self.cron:
+                slot = self.cron.next_after(slot)
+            else:
+                slot += timedelta(days=1 + min((day - slot.weekday() - 1) % 7
+                                               for day in self.days_to_run))
+        return missed
 
+    def restore(self, amount_of_runs: int, last_trigger: datetime,
+                slot: datetime, catch_up: str = "once") -> bool:
+        """
+        Continue from the state saved by a JobStore in an
+        earlier run of the application.
+
+        :param amount_of_runs: int, saved amount_of_runs
+        :param last_trigger: datetime, saved last_trigger
+        :param slot: datetime, the saved point in time given
+                     by the rules, without jitter
+        :param catch_up: str, what to do with the firings that
+                         were missed while the application was
+                         not running:
+                            "skip": drop them, continue with the
+                                    next point in time to come
+                            "once": fire once right away, for any
+                                    amount of missed firings
+                            "all":  fire once right away for each
+                                    of them. The overlap policy
+                                    of the Job still applies.
+        :returns: bool, False if the TimeTrigger will not be
+                  pulled again, being a trigger that is not
+                  reoccurring and has been pulled already, or
+                  that missed its firing with catch_up "skip"
+        """
+        if catch_up not in self.catch_up_policies:
+            raise ValueError(f"'{catch_up}' is an invalid value for 'catch_up'")
+        self.amount_of_runs = amount_of_runs
+        self.last_trigger = last_trigger
+        if slot is None or (amount_of_runs and not self.reoccurring):
+            return not amount_of_runs
+
+        now = self._now()
+        self._slot = slot
+        if slot > now:
+            self._arm()
+        elif catch_up == "skip":
+            if not self.reoccurring:
+                return False
+            self.reset()
+        else:
+            if catch_up == "all":
+                self._catch_up = self._missed_slots(slot, now) - 1
+            self._arm(datetime.now(self.timezone))
+        return True
 
-class Job(Thread):
+
+class Job:
     """
-    Threaded job, scheduled for a specific
-    interval and / or time of execution.
+    Job, scheduled for a specific interval
+    and / or time of execution.
 
-    The Job class is runnable as a separate
-    thread, thus leaving any function that it's
-    calling non-blocking.
+    The Job does not run on a thread of its own.
+    Once started, it is kept by a SchedulerEngine
+    which calls the execute method on one of its
+    worker threads each time the TimeTrigger is
+    pulled, thus leaving any function that it's
+    calling non-blocking. Jobs with coroutine 
+    functions are kept by an AsyncioSchedulerEngine
+    instead, which awaits execute_async on its loop.
     """
 
+    _id_counter = itertools.count(1)
+
+    overlap_policies = ("skip", "queue", "concurrent")
+    misfire_policies = ("run", "skip")
+
     def __init__(self, func: Callable,
                  is_async: bool,
                  trigger: TimeTrigger,
                  recipient: Callable,
                  func_name: str,
-                 return_self: bool = False):
-        super().__init__()
-        self.kwargs = None
+                 return_self: bool = False,
+                 engine=None,
+                 overlap: str = "queue",
+                 max_instances: int = 1,
+                 max_queued: int = 1,
+                 misfire: str = "run",
+                 misfire_grace: float = None,
+                 kwargs: dict = None,
+                 key: str = None,
+                 store: JobStore = None,
+                 registry=None,
+                 metrics: SchedulerMetrics = None,
+                 retry: RetryPolicy = None):
+        """
+        :param overlap: str, what to do when the Job is triggered
+                        while it is still executing, see OverlapGuard.
+                        Valid parameters: "skip", "queue", "concurrent"
+        :param max_instances: int, executions running at once when
+                              overlap is "concurrent"
+        :param max_queued: int, firings waiting when overlap is "queue"
+        :param misfire: str, what to do when the Job is triggered
+                        later than misfire_grace seconds delay its
+                        next_trigger. Valid parameters:
+                            "run": execute it anyway
+                            "skip": drop the firing
+        :param misfire_grace: float, seconds a firing may be late
+                              before it is a misfire. No limit if omitted.
+        :param kwargs: dict, the keyword arguments bound to func
+        :param key: str, key of the Job in the JobStore, func_name
+                    if omitted
+        :param store: JobStore, in which the state of the Job is
+                      saved each time it is triggered
+        :param registry: JobRegistry, notified as the Job changes
+                         state. Set by JobRegistry.register.
+        :param metrics: SchedulerMetrics, to which the duration
+                        and the errors of executions are reported
+        :param retry: RetryPolicy, by which the function is retried
+                      when it raises. Not retried if omitted.
+        """
+        if overlap not in self.overlap_policies:
+            raise ValueError(f"'{overlap}' is an invalid value for 'overlap'")
+        if misfire not in self.misfire_policies:
+            raise ValueError(f"'{misfire}' is an invalid value for 'misfire'")
+        if max_instances < 1:
+            raise ValueError("'max_instances' must be at least 1")
+
+        self.native_id = next(Job._id_counter)
+        self.name = func_name
+        self.kwargs = kwargs
+        self.key = key or func_name
+        self.store = store
+        self.registry = registry
+        self.metrics = metrics
+        self.retry = retry
+        self._breaker = retry.breaker(func_name) if retry is not None else None
         self.func = func
         self.is_async = is_async
         self.func_name = func_name
         self.trigger = trigger
         self.recipient = recipient
         self.return_self = return_self
+        self.engine = engine
+        self.overlap = overlap
+        self.max_instances = max_instances
+        self.max_queued = max_queued
+        self.misfire = misfire
+        self.misfire_grace = misfire_grace
         self.time_to_die = False
         self.error = None
         self.result = None
         self._running = False
+        self._finishing = threading.Lock()
+        self._started = False
+        self._failed = False
+        self._options = None
+        self._func_reference = None
+        self._recipient_reference = None
 
     def __repr__(self):
         return f"Job(" \
                f"func_name={self.func_name}, " \
                f"is_async={self.is_async}, " \
                f"running={self.running}, " \
-               f"recipient={self.recipient.__name__}, " \
+               f"recipient={getattr(self.recipient, '__name__', self.recipient)}, " \
                f"native_id={self.native_id}, " \
                f"trigger={self.trigger}, " \
                f"result='{self.result}', " \
                f"error={f'{type(self.error).__name__}({self.error})' if self.error else None}" \
                f")"
 
-    def run(self) -> None:
+    def start(self) -> None:
         """
-        Thread overloaded method
-        Await the TimeTrigger object to fire on
-        it's point in time, and call the callable
-        passed as self.func.
+        Hand the Job to its SchedulerEngine, which will
+        execute it each time its TimeTrigger is pulled.
+        A Job can only be started once.
         """
+        if self._started:
+            raise RuntimeError(f"Job '{self.func_name}' ({self.native_id}) "
+                               f"can only be started once")
+        if self.engine is None:
+            raise RuntimeError(f"Job '{self.func_name}' ({self.native_id}) "
+                               f"has no SchedulerEngine to run on")
+        self._started = True
         self._running = True
+        if self.registry is not None:
+            self.registry.update(self)
+        self.engine.add(self)
+
+    def execute(self) -> bool:
+        """
+        Call the callable passed as self.func, and pass
+        its output to the recipient. This is done by the
+        SchedulerEngine each time the TimeTrigger is pulled.
+
+        If the function raises, it is retried by the
+        RetryPolicy of the Job, if any. Errors do not stop
+        the Job, a reoccurring Job is executed again the
+        next time it is triggered.
+        :returns: bool, whether the Job ran without errors
+        """
+        if not self._breaker_allows():
+            return False
 
+        # Evaluate if self.func and / or recipient is async or
+        # not. Call them accordingly. Jobs with coroutines are
+        # normally run by an AsyncioSchedulerEngine through 
+        # execute_async instead.
+        attempt = 1
         while True:
-            if self.time_to_die:
-                commandintegrator.logger.log(
-                    f"Job '{self.native_id}' got a "
-                    f"graceful kill signal, shutting "
-                    f"down.")
+            started = time.perf_counter()
+            try:
+                # Get the output of the scheduled function
+                if self.is_async:
+                    self.result = asyncio.run(self.func())
+                else:
+                    self.result = self.func()
                 break
+            except Exception as e:
+                if (delay := self._func_failed(e, attempt)) is None:
+                    return False
+            finally:
+                self._executed(started)
+            time.sleep(delay)
+            attempt += 1
+        self._func_succeeded()
+        if not self._has_output():
+            return True
 
-            if self.trigger.is_pulled():
-
-                # Evaluate if self.func and / or recipient is async or
-                # not. Call them accordingly.
-                try:
-                    # Get the output of the scheduled function
-                    if self.is_async:
-                        self.result = asyncio.run(self.func())
-                    else:
-                        self.result = self.func()
-                except Exception as e:
-                    commandintegrator.logger.log(f"The schedule job '{self.name}' "
-                                                 f"raised {type(e).__name__}('{str(e)}') "
-                                                 f"upon executing it", level="error")
-                    print("Job encountered an error:", e)
-                    self.error = e
-                    break
-
-                # Call the recipient function with the job output
-                try:
-                    # Pass it on to the recipient
-                    output = self if self.return_self else self.result
-                    if inspect.iscoroutinefunction(self.recipient):
-                        asyncio.run(self.recipient(output))
-                    else:
-                        self.recipient(output)
-                except Exception as e:
-                    commandintegrator.logger.log(f"The schedule job '{self.name}' "
-                                                 f"ran OK but the recipient function "
-                                                 f"{self.recipient} raised {type(e).__name__}"
-                                                 f"('{str(e)}') ", level="error")
-                    break
-            if not self.trigger.reoccurring and self.trigger.amount_of_runs > 0:
+        # Call the recipient function with the job output
+        try:
+            # Pass it on to the recipient
+            if inspect.iscoroutinefunction(self.recipient):
+                asyncio.run(self.recipient(self.output))
+            else:
+                self.recipient(self.output)
+        except Exception as e:
+            return self._recipient_failed(e)
+        return True
+
+    async def execute_async(self) -> bool:
+        """
+        Coroutine counterpart of the execute method, used
+        by the AsyncioSchedulerEngine. Coroutine functions
+        are awaited on the running loop, while synchronous 
+        ones are run in the default executor of the loop.
+        :returns: bool, whether the Job ran without errors
+        """
+        if not self._breaker_allows():
+            return False
+
+        loop = asyncio.get_running_loop()
+        attempt = 1
+        while True:
+            started = time.perf_counter()
+            try:
+                if self.is_async:
+                    self.result = await self.func()
+                else:
+                    self.result = await loop.run_in_executor(None, self.func)
                 break
-            time.sleep(0.01)
-        self._running = False
+            except Exception as e:
+                if (delay := self._func_failed(e, attempt)) is None:
+                    return False
+            finally:
+                self._executed(started)
+            await asyncio.sleep(delay)
+            attempt += 1
+        self._func_succeeded()
+        if not self._has_output():
+            return True
+
+        try:
+            if inspect.iscoroutinefunction(self.recipient):
+                await self.recipient(self.output)
+            else:
+                await loop.run_in_executor(None, self.recipient, self.output)
+        except Exception as e:
+            return self._recipient_failed(e)
+        return True
+
+    def _has_output(self) -> bool:
+        """
+        Whether the result of an execution is passed on
+        to the recipient, which it always is for a Job.
+        See PollingJob.
+        """
+        return True
+
+    @property
+    def output(self):
+        """
+        What is passed on to the recipient
+        """
+        return self if self.return_self else self.result
+
+    def _executed(self, started: float) -> None:
+        if self.metrics is not None:
+            self.metrics.executed(self.func_name, time.perf_counter() - started)
+
+    def _breaker_allows(self) -> bool:
+        if self._breaker is None or self._breaker.allow():
+            return True
+        commandintegrator.logger.log(f"The circuit breaker of schedule job '{self.name}' "
+                                     f"is open, skipping the execution")
+        if self.metrics is not None:
+            self.metrics.skipped(self.func_name)
+        return False
+
+    def _func_succeeded(self) -> None:
+        self._failed = False
+        if self._breaker is not None:
+            self._breaker.success()
+
+    def _func_failed(self, e: Exception, attempt: int = 1) -> float:
+        """
+        :returns: float, seconds to wait before the function
+                  is retried, or None if it is not retried
+        """
+        commandintegrator.logger.log(f"The schedule job '{self.name}' "
+                                     f"raised {type(e).__name__}('{str(e)}') "
+                                     f"upon executing it, attempt {attempt}", level="error")
+        if self.metrics is not None:
+            self.metrics.failed(self.func_name)
+        self.error = e
+        if self.retry is not None and self.alive and self.retry.should_retry(attempt, e):
+            return self.retry.delay(attempt)
+        self._failed = True
+        if self._breaker is not None:
+            self._breaker.failure()
+        return None
+
+    def _recipient_failed(self, e: Exception) -> bool:
+        commandintegrator.logger.log(f"The schedule job '{self.name}' "
+                                     f"ran OK but the recipient function "
+                                     f"{self.recipient} raised {type(e).__name__}"
+                                     f"('{str(e)}') ", level="error")
+        if self.metrics is not None:
+            self.metrics.failed(self.func_name, recipient=True)
+        self._failed = True
+        return False
+
+    def record(self) -> JobRecord:
+        """
+        The state of the Job, to be saved in a JobStore
+        """
+        if self._options is None:
+            target = self.func.func if isinstance(self.func, functools.partial) else self.func
+            options = dict(rules=self.trigger.rules, kwargs=self.kwargs or {},
+                           overlap=self.overlap, max_instances=self.max_instances,
+                           max_queued=self.max_queued, misfire=self.misfire,
+                           misfire_grace=self.misfire_grace)
+            self._func_reference = reference(target)
+            self._recipient_reference = None if self.return_self else reference(self.recipient)
+            try:
+                encoded = json.dumps(options, default=encode)
+            except TypeError:
+                # The keyword arguments can not be saved, nor the Job recreated
+                options["kwargs"], self._func_reference = None, None
+                encoded = json.dumps(options, default=encode)
+            self._options = json.loads(encoded)
+
+        return JobRecord(key=self.key,
+                         func=self._func_reference,
+                         recipient=self._recipient_reference,
+                         options=self._options,
+                         amount_of_runs=self.trigger.amount_of_runs,
+                         last_trigger=self.trigger.last_trigger,
+                         next_trigger=self.trigger.next_trigger,
+                         slot=self.trigger.slot)
+
+    def persist(self) -> None:
+        """
+        Save the state of the Job in its JobStore, if any.
+        """
+        if self.store is not None:
+            self.store.save(self.record())
+
+    def triggered(self) -> None:
+        """
+        Called by the engines each time the Job is triggered,
+        to save its state and update the registry
+        """
+        self.persist()
+        if self.registry is not None:
+            self.registry.update(self)
+
+    def is_misfire(self, lateness: float) -> bool:
+        """
+        Whether a firing, late by the given amount of
+        seconds, is to be dropped by the misfire policy
+        """
+        return self.misfire == "skip" and self.misfire_grace is not None \
+            and lateness > self.misfire_grace
+
+    def finish(self) -> None:
+        """
+        Called by the SchedulerEngine when the Job will
+        not be executed again. Only the first call has
+        any effect.
+        """
+        with self._finishing:
+            if not self._running:
+                return
+            self._running = False
+        if self.time_to_die:
+            commandintegrator.logger.log(
+                f"Job '{self.native_id}' got a "
+                f"graceful kill signal, shutting "
+                f"down.")
+        if self.registry is not None:
+            self.registry.update(self)
 
     @property
     def running(self) -> bool:
         return self._running
 
+    @property
+    def state(self) -> str:
+        """
+        "pending" until started, "running" until finished,
+        then "failed" if its last execution failed, or
+        "done" otherwise. See JobRegistry.
+        """
+        if not self._started:
+            return "pending"
+        if self._running:
+            return "running"
+        return "failed" if self._failed else "done"
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    @property
+    def alive(self) -> bool:
+        """
+        Whether the Job is to be executed again when
+        triggered, that is, not killed.
+        """
+        return not self.time_to_die
+
     def kill_gracefully(self) -> None:
         """
         Provices a method to set the self.time_to_die
-        to True to signal it's time to check out
+        to True to signal it's time to check out.
+        The Job is not executed again, but an execution
+        in progress is allowed to finish.
         """
         self.time_to_die = True
+        if self.store is not None:
+            self.store.remove(self.key)
+        if self.engine is not None:
+            self.engine.discard(self)
@@ -0,0 +1,149 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+
+class CronExpression:
+    """
+    CronExpression class
+
+    Parses a cron expression with the five standard
+    fields: minute, hour, day of month, month and
+    day of week, and computes the next point in time
+    that matches it.
+
+    Each field accepts "*", single values, ranges
+    "a-b", steps "*/n" or "a-b/n" and lists "a,b,c".
+    Months and days of week also accept their three
+    letter english names, "jan" or "mon". Sunday is
+    0 or 7 as day of week. As in cron, a day matches
+    either the day of month or the day of week when
+    both are restricted, that is, when neither of them
+    starts with "*". So "0 0 */2 * mon" fires on mondays
+    with an odd day of month, and "0 0 1-31 * mon" on
+    every day.
+
+    The aliases "@yearly", "@annually", "@monthly",
+    "@weekly", "@daily", "@midnight" and "@hourly"
+    are supported.
+    """
+    aliases = {
+        "@yearly": "0 0 1 1 *",
+        "@annually": "0 0 1 1 *",
+        "@monthly": "0 0 1 * *",
+        "@weekly": "0 0 * * 0",
+        "@daily": "0 0 * * *",
+        "@midnight": "0 0 * * *",
+        "@hourly": "0 * * * *",
+    }
+
+    month_names = ("jan", "feb", "mar", "apr", "may", "jun",
+                   "jul", "aug", "sep", "oct", "nov", "dec")
+    day_names = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+    def __init__(self, expression: str):
+        """
+        :param expression: str, cron expression, for example
+                           "*/15 9-17 * * mon-fri"
+        :raises: ValueError, if the expression is invalid
+        """
+        self.expression = expression
+        fields = self.aliases.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"'{expression}' is an invalid cron expression, "
+                             f"expected 5 fields")
+
+        self.minutes = self._parse(fields[0], 0, 59)
+        self.hours = self._parse(fields[1], 0, 23)
+        self.days = self._parse(fields[2], 1, 31)
+        self.months = self._parse(fields[3], 1, 12, self.month_names, 1)
+        weekdays = self._parse(fields[4], 0, 7, self.day_names, 0)
+
+        # Cron counts days of week from sunday, datetime from monday
+        self.weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        # Unrestricted when starting with "*", as in Vixie cron
+        self.any_day = fields[2].startswith("*")
+        self.any_weekday = fields[4].startswith("*")
+
+    def __repr__(self):
+        return f"CronExpression('{self.expression}')"
+
+    def _parse(self, field: str, low: int, high: int,
+               names: tuple = None, offset: int = 0) -> tuple:
+        values = set()
+        for part in field.lower().split(","):
+            step = 1
+            if "/" in part:
+                part, step = part.split("/", 1)
+                step = self._value(step, 1, high, None, 0)
+            if part == "*":
+                first, last = low, high
+            elif "-" in part:
+                first, last = (self._value(i, low, high, names, offset) for i in part.split("-", 1))
+            else:
+                first = self._value(part, low, high, names, offset)
+                last = high if step > 1 else first
+            if first > last:
+                raise ValueError(f"'{field}' is an invalid cron field")
+            values.update(range(first, last + 1, step))
+        return tuple(sorted(values))
+
+    def _value(self, value: str, low: int, high: int, names: tuple, offset: int) -> int:
+        if names and value in names:
+            return names.index(value) + offset
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is an invalid value in cron "
+                             f"expression '{self.expression}'") from None
+        if not low <= number <= high:
+            raise ValueError(f"'{value}' is out of range in cron "
+                             f"expression '{self.expression}'")
+        return number
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day = dt.day in self.days
+        weekday = dt.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, dt: datetime) -> datetime:
+        """
+        Return the first point in time after the given one
+        that matches the expression. Instead of stepping
+        minute by minute, each field jumps straight to its
+        next matching value, so at most a few steps per
+        day of the month are needed.
+
+        :param dt: datetime, naive or timezone aware
+        :returns: datetime
+        :raises: ValueError, if nothing matches within 8 years,
+                 as with "0 0 30 2 *"
+        """
+        t = (dt + timedelta(minutes=1)).replace(second=0, microsecond=0)
+        limit = t.year + 8
+
+        while t.year <= limit:
+            if t.month not in self.months:
+                if (i := bisect_left(self.months, t.month)) < len(self.months):
+                    t = t.replace(month=self.months[i], day=1, hour=0, minute=0)
+                else:
+                    t = t.replace(year=t.year + 1, month=self.months[0], day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                if (i := bisect_left(self.hours, t.hour)) < len(self.hours):
+                    t = t.replace(hour=self.hours[i], minute=0)
+                else:
+                    t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.minute not in self.minutes:
+                if (i := bisect_left(self.minutes, t.minute)) < len(self.minutes):
+                    t = t.replace(minute=self.minutes[i])
+                else:
+                    t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t
+        raise ValueError(f"cron expression '{self.expression}' never matches")
@@ -0,0 +1,329 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+import commandintegrator
+from commandintegrator.tools.scheduling.pool import JobPool, OverlapGuard
+
+
+def misfired(job, lateness: float) -> None:
+    commandintegrator.logger.log(f"Job '{job.func_name}' ({job.native_id}) misfired "
+                                 f"{lateness:.3f} seconds late, skipping it")
+    if job.metrics is not None:
+        job.metrics.misfired(job.func_name)
+
+
+def skipped(job) -> None:
+    commandintegrator.logger.log(f"Job '{job.func_name}' ({job.native_id}) is "
+                                 f"still executing, skipping overlapping firing")
+    if job.metrics is not None:
+        job.metrics.skipped(job.func_name)
+
+
+class SchedulerEngine:
+    """
+    SchedulerEngine class
+
+    Runs any number of Jobs on a single scheduling
+    thread. The started Jobs are kept in a min-heap
+    ordered by the deadline of their TimeTrigger,
+    and the scheduling thread sleeps on a condition
+    variable until the earliest of them is due, or
+    until a Job is added. Due Jobs are handed to a
+    JobPool for execution, and put back in the heap
+    for their next trigger right away, if their
+    TimeTrigger is reoccurring. Firings that overlap
+    a running execution are handled by the overlap
+    policy of the Job, and late firings by its
+    misfire policy.
+
+    The scheduling thread is started with the first
+    Job, and is a daemon thread.
+    """
+
+    def __init__(self, max_workers: int = None):
+        """
+        :param max_workers: int, global limit of Jobs executing
+                            at once, see JobPool.
+        """
+        self.max_workers = max_workers
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread = None
+        self._pool: JobPool = None
+
+    def __repr__(self):
+        return f"SchedulerEngine(" \
+               f"scheduled={len(self._heap)}, " \
+               f"max_workers={self.max_workers})"
+
+    @property
+    def pool(self) -> JobPool:
+        with self._condition:
+            if self._pool is None:
+                self._pool = JobPool(self.max_workers)
+            return self._pool
+
+    def add(self, job) -> None:
+        """
+        Schedule the Job for its next trigger.
+        :param job: Job instance
+        """
+        with self._condition:
+            if self._thread is None:
+                if self._pool is None:
+                    self._pool = JobPool(self.max_workers)
+                self._thread = threading.Thread(target=self._run,
+                                                name="SchedulerEngine",
+                                                daemon=True)
+                self._thread.start()
+            self._push(job)
+            self._condition.notify()
+
+    def discard(self, job) -> None:
+        """
+        Stop scheduling the Job. It is finished right
+        away, unless it is being executed, in which case
+        it is finished when the execution returns.
+        :param job: Job instance
+        """
+        with self._condition:
+            if self._pool is None or self._pool.is_idle(job):
+                job.finish()
+            self._condition.notify()
+
+    def reschedule(self, job, interval) -> None:
+        """
+        Change the interval of a scheduled Job, see
+        TimeTrigger.set_interval. The heap entry of
+        its former deadline is dropped when reached.
+        :param job: Job instance
+        :param interval: timedelta
+        """
+        with self._condition:
+            job.trigger.set_interval(interval)
+            if job.registry is not None:
+                job.registry.update(job)
+            self._push(job)
+            self._condition.notify()
+
+    def _push(self, job) -> None:
+        heapq.heappush(self._heap, (job.trigger.deadline, next(self._sequence), job))
+
+    def _run(self) -> None:
+        """
+        The scheduling loop. Pop the earliest Job when
+        it is due, and sleep until then otherwise.
+        """
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                deadline, _, job = self._heap[0]
+                if deadline != job.trigger.deadline:
+                    # The Job was rescheduled
+                    heapq.heappop(self._heap)
+                    continue
+                if not job.alive:
+                    heapq.heappop(self._heap)
+                    if self._pool.is_idle(job):
+                        job.finish()
+                    continue
+                if (timeout := deadline - time.monotonic()) > 0:
+                    self._condition.wait(timeout)
+                    continue
+                heapq.heappop(self._heap)
+                lateness = time.monotonic() - job.trigger.deadline
+                if not job.trigger.is_pulled():
+                    self._push(job)
+                    continue
+                if job.trigger.reoccurring:
+                    self._push(job)
+            # Saving the Job may write to its JobStore, not
+            # to be waited for while holding the condition
+            job.triggered()
+            self._dispatch(job, lateness)
+
+    def _dispatch(self, job, lateness: float) -> None:
+        if job.is_misfire(lateness):
+            misfired(job, lateness)
+        else:
+            if job.metrics is not None:
+                job.metrics.triggered(job.func_name, lateness)
+            with self._condition:
+                # Not admitted once finished, see _done
+                decision = self._pool.submit(job, self._done) if job.running else None
+            if decision == OverlapGuard.SKIP:
+                skipped(job)
+        self._done(job)
+
+    def _done(self, job, ok: bool = True) -> None:
+        """
+        Finish the Job if it will not be executed again.
+        Called by the scheduling thread and the workers,
+        the check and the finishing are made under the
+        condition, as are the admissions of firings.
+        """
+        with self._condition:
+            if (not job.alive or not job.trigger.reoccurring) and self._pool.is_idle(job):
+                job.finish()
+
+
+class AsyncioSchedulerEngine:
+    """
+    AsyncioSchedulerEngine class
+
+    Runs Jobs with coroutine functions or coroutine
+    recipients on a single, long-lived asyncio event
+    loop, instead of creating a new loop for each
+    execution. The next trigger of each Job is armed
+    with loop.call_at, and the Jobs are executed as
+    tasks on the loop through Job.execute_async, with
+    the same overlap and misfire policies as with
+    the SchedulerEngine.
+
+    The loop is either the one of the host application,
+    passed on construction, or a loop of its own which
+    is started on a daemon thread with the first Job.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None, max_tasks: int = None):
+        """
+        :param loop: event loop of the host application to
+                     run the Jobs on. If omitted, the engine
+                     runs a loop of its own.
+        :param max_tasks: int, global limit of Jobs executing
+                          at once. No limit if omitted.
+        """
+        self.max_tasks = max_tasks
+        self.guard = OverlapGuard()
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._handles = {}
+        self._semaphore: asyncio.Semaphore = None
+        self._thread: threading.Thread = None
+
+    def __repr__(self):
+        return f"AsyncioSchedulerEngine(" \
+               f"scheduled={len(self._handles)}, " \
+               f"max_tasks={self.max_tasks}, " \
+               f"loop={self._loop})"
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The loop the Jobs run on, started on a
+        thread of its own if none was given.
+        """
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="AsyncioSchedulerEngine",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def add(self, job) -> None:
+        """
+        Schedule the Job for its next trigger. Safe
+        to call from any thread.
+        :param job: Job instance
+        """
+        self.loop.call_soon_threadsafe(self._arm, job)
+
+    def discard(self, job) -> None:
+        """
+        Stop scheduling the Job. It is finished right
+        away, unless it is being executed, in which case
+        it is finished when the execution returns.
+        :param job: Job instance
+        """
+        self.loop.call_soon_threadsafe(self._discard, job)
+
+    def reschedule(self, job, interval) -> None:
+        """
+        Change the interval of a scheduled Job, see
+        TimeTrigger.set_interval. Safe to call from
+        any thread.
+        :param job: Job instance
+        :param interval: timedelta
+        """
+        self.loop.call_soon_threadsafe(self._reschedule, job, interval)
+
+    def _reschedule(self, job, interval) -> None:
+        if (handle := self._handles.pop(job, None)) is None:
+            # Finished meanwhile
+            return
+        handle.cancel()
+        job.trigger.set_interval(interval)
+        if job.registry is not None:
+            job.registry.update(job)
+        self._arm(job)
+
+    def _discard(self, job) -> None:
+        if (handle := self._handles.pop(job, None)) is not None:
+            handle.cancel()
+        self._done(job)
+
+    def _arm(self, job) -> None:
+        delay = job.trigger.deadline - time.monotonic()
+        self._handles[job] = self._loop.call_at(self._loop.time() + max(delay, 0),
+                                                self._fire, job)
+
+    def _fire(self, job) -> None:
+        self._handles.pop(job, None)
+        if not job.alive:
+            self._done(job)
+            return
+        lateness = time.monotonic() - job.trigger.deadline
+        if not job.trigger.is_pulled():
+            self._arm(job)
+            return
+        if job.trigger.reoccurring:
+            self._arm(job)
+        job.triggered()
+
+        if job.is_misfire(lateness):
+            misfired(job, lateness)
+        else:
+            if job.metrics is not None:
+                job.metrics.triggered(job.func_name, lateness)
+            if (decision := self.guard.admit(job)) == OverlapGuard.RUN:
+                self._loop.create_task(self._execute(job))
+            elif decision == OverlapGuard.SKIP:
+                skipped(job)
+        self._done(job)
+
+    async def _execute(self, job) -> None:
+        if self.max_tasks is not None and self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_tasks)
+        rerun = True
+        while rerun:
+            try:
+                if self._semaphore is not None:
+                    async with self._semaphore:
+                        await job.execute_async()
+                else:
+                    await job.execute_async()
+            except Exception as e:
+                commandintegrator.logger.log(f"AsyncioSchedulerEngine could not execute job "
+                                             f"'{job.func_name}': {type(e).__name__}('{e}')",
+                                             level="error")
+            rerun = self.guard.release(job)
+            self._done(job)
+
+    def _done(self, job) -> None:
+        """
+        Finish the Job if it will not be executed again.
+        """
+        if not job.alive:
+            if (handle := self._handles.pop(job, None)) is not None:
+                handle.cancel()
+        elif job.trigger.reoccurring:
+            return
+        if self.guard.is_idle(job):
+            job.finish()
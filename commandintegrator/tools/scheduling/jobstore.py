@@ -0,0 +1,235 @@
+import importlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+
+@dataclass
+class JobRecord:
+    """
+    The saved state of a Job, by which it is restored
+    when the application is started again.
+
+    key:            the key of the Job, unique in the JobStore
+    func:           import reference to the function of the
+                    Job, "module:qualname", or None if the
+                    function is not importable, as with bound
+                    methods and lambdas. Such Jobs are not
+                    recreated, but take on their saved state
+                    when scheduled again with the same key.
+    recipient:      import reference to the recipient, or None
+                    for the default recipient
+    options:        the rules of the TimeTrigger, the policies
+                    and the keyword arguments of the Job
+    amount_of_runs: amount of times the Job has been triggered
+    last_trigger:   when it was triggered last
+    next_trigger:   when it is to be triggered next
+    slot:           the point in time given by the rules of the
+                    TimeTrigger for the next trigger, without jitter
+    """
+    key: str
+    func: Optional[str]
+    recipient: Optional[str]
+    options: dict = field(default_factory=dict)
+    amount_of_runs: int = 0
+    last_trigger: datetime = None
+    next_trigger: datetime = None
+    slot: datetime = None
+
+
+def reference(obj: Callable) -> Optional[str]:
+    """
+    Return the import reference of a module level
+    function or class, "module:qualname", or None if
+    it can not be imported by it.
+    """
+    module, qualname = getattr(obj, "__module__", None), getattr(obj, "__qualname__", "")
+    if not module or "<" in qualname:
+        return None
+    try:
+        found = importlib.import_module(module)
+        for name in qualname.split("."):
+            found = getattr(found, name)
+    except (ImportError, AttributeError):
+        return None
+    return f"{module}:{qualname}" if found is obj else None
+
+
+def resolve(ref: str) -> Callable:
+    """
+    Import the object by a reference made by 'reference'
+    :raises: ImportError, AttributeError
+    """
+    module, qualname = ref.split(":", 1)
+    found = importlib.import_module(module)
+    for name in qualname.split("."):
+        found = getattr(found, name)
+    return found
+
+
+class JobStore(ABC):
+    """
+    JobStore class
+
+    Base class of the stores in which the scheduler
+    keeps the state of its Jobs across restarts of
+    the application. Subclasses implement 'load',
+    which returns every saved JobRecord at once, and
+    'write', which saves and deletes records in batches.
+
+    Saved and removed records are held back and written
+    together once 'batch_size' of them are pending, or
+    'flush_interval' seconds have passed since the last
+    write, and when the store is flushed or closed.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 1.0):
+        """
+        :param batch_size: int, amount of pending changes
+                           that triggers a write
+        :param flush_interval: float, longest time in seconds
+                               that changes are held back,
+                               provided that Jobs keep firing
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Optional[JobRecord]] = {}
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+
+    @abstractmethod
+    def load(self) -> Dict[str, JobRecord]:
+        """
+        Return every saved record, by key
+        """
+
+    @abstractmethod
+    def write(self, records: Iterable[JobRecord], removed: Iterable[str]) -> None:
+        """
+        Save the records, replacing saved ones with
+        the same key, and delete the removed keys
+        """
+
+    def save(self, record: JobRecord) -> None:
+        with self._lock:
+            self._pending[record.key] = record
+            self._flush_if_due()
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._pending[key] = None
+            self._flush_if_due()
+
+    def _flush_if_due(self) -> None:
+        if len(self._pending) >= self.batch_size or \
+                time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the pending changes
+        """
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self.write([i for i in pending.values() if i is not None],
+                       [key for key, record in pending.items() if record is None])
+
+    def close(self) -> None:
+        self.flush()
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLiteJobStore class
+
+    Keeps the JobRecords in a table in an SQLite
+    database file. Each batch is written in a single
+    transaction, and every record is loaded with a
+    single query.
+    """
+
+    columns = ("key", "func", "recipient", "options", "amount_of_runs",
+               "last_trigger", "next_trigger", "slot")
+
+    def __init__(self, path: str = "commandintegrator.jobs.sqlite",
+                 table: str = "jobs", **kwargs):
+        """
+        :param path: str, path of the database file
+        :param table: str, name of the table
+        :param kwargs: batch_size and flush_interval, see JobStore
+        """
+        super().__init__(**kwargs)
+        if not table.isidentifier():
+            raise ValueError(f"'{table}' is an invalid table name")
+        self.path = str(path)
+        self.table = table
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ("
+                                     f"key TEXT PRIMARY KEY, func TEXT, recipient TEXT, "
+                                     f"options TEXT NOT NULL, amount_of_runs INTEGER NOT NULL, "
+                                     f"last_trigger TEXT, next_trigger TEXT, slot TEXT)")
+
+    def __repr__(self):
+        return f"SQLiteJobStore(path={self.path}, table={self.table})"
+
+    @staticmethod
+    def _datetime(value: Optional[str]) -> Optional[datetime]:
+        return datetime.fromisoformat(value) if value else None
+
+    def load(self) -> Dict[str, JobRecord]:
+        with self._lock:
+            rows = self._connection.execute(f"SELECT {', '.join(self.columns)} "
+                                            f"FROM {self.table}").fetchall()
+        return {key: JobRecord(key=key, func=func, recipient=recipient,
+                               options=json.loads(options),
+                               amount_of_runs=amount_of_runs,
+                               last_trigger=self._datetime(last_trigger),
+                               next_trigger=self._datetime(next_trigger),
+                               slot=self._datetime(slot))
+                for key, func, recipient, options, amount_of_runs,
+                    last_trigger, next_trigger, slot in rows}
+
+    def write(self, records: Iterable[JobRecord], removed: Iterable[str]) -> None:
+        rows = [(i.key, i.func, i.recipient, json.dumps(i.options, default=encode),
+                 i.amount_of_runs,
+                 *(dt.isoformat() if dt else None for dt in (i.last_trigger, i.next_trigger, i.slot)))
+                for i in records]
+        with self._lock, self._connection:
+            self._connection.executemany(f"INSERT OR REPLACE INTO {self.table} "
+                                         f"({', '.join(self.columns)}) "
+                                         f"VALUES ({', '.join('?' * len(self.columns))})", rows)
+            self._connection.executemany(f"DELETE FROM {self.table} WHERE key = ?",
+                                         [(key,) for key in removed])
+
+    def close(self) -> None:
+        super().close()
+        with self._lock:
+            self._connection.close()
+
+
+def encode(value):
+    """
+    JSON encoding of the values in the rules of a TimeTrigger
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return f"{value.total_seconds()}s"
+    if hasattr(value, "zone"):
+        # pytz timezone
+        return value.zone
+    if hasattr(value, "expression"):
+        # CronExpression
+        return value.expression
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
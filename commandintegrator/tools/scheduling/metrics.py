@@ -0,0 +1,169 @@
+import threading
+from bisect import bisect_left
+from typing import Dict
+
+
+class Histogram:
+    """
+    Histogram class
+
+    Counts observed amounts of seconds in fixed buckets,
+    from a millisecond to five minutes, along with their
+    count, sum and max. Observing is a binary search and
+    a few additions, and the memory used does not grow
+    with the amount of observations. Quantiles are given
+    as the upper bound of the bucket they fall in.
+    """
+    bounds = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+              0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        :param q: float, between 0 and 1
+        :returns: float, upper bound of the bucket of the
+                  quantile, or the max if it is past the
+                  last bucket. 0 if nothing is observed.
+        """
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen and seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {**{str(bound): count for bound, count in zip(self.bounds, self.counts)},
+                        "+Inf": self.counts[-1]},
+        }
+
+
+class JobMetrics:
+    """
+    The metrics of the Jobs with the same name
+    """
+    __slots__ = ("runs", "errors", "recipient_errors", "skipped",
+                 "misfired", "lateness", "duration")
+
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.recipient_errors = 0
+        self.skipped = 0
+        self.misfired = 0
+        self.lateness = Histogram()
+        self.duration = Histogram()
+
+    def snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "recipient_errors": self.recipient_errors,
+            "skipped": self.skipped,
+            "misfired": self.misfired,
+            "lateness": self.lateness.snapshot(),
+            "duration": self.duration.snapshot(),
+        }
+
+
+class SchedulerMetrics:
+    """
+    SchedulerMetrics class
+
+    Collects the metrics of scheduled Jobs by their name:
+
+        runs:             times the function was executed
+        errors:           times the function raised
+        recipient_errors: times the recipient raised
+        skipped:          firings dropped by the overlap policy
+        misfired:         firings dropped by the misfire policy
+        lateness:         Histogram of the seconds between the
+                          next_trigger of the Job and the moment
+                          it was triggered
+        duration:         Histogram of the seconds the function
+                          took to execute
+
+    The engines and the Jobs report to it as they go. Every
+    report is a dict lookup and a few additions under a lock,
+    cheap enough to leave enabled.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, JobMetrics] = {}
+
+    def __repr__(self):
+        return f"SchedulerMetrics(jobs={len(self._jobs)}, enabled={self.enabled})"
+
+    def _get(self, name: str) -> JobMetrics:
+        if (metrics := self._jobs.get(name)) is None:
+            metrics = self._jobs[name] = JobMetrics()
+        return metrics
+
+    def triggered(self, name: str, lateness: float) -> None:
+        if self.enabled:
+            with self._lock:
+                self._get(name).lateness.observe(lateness)
+
+    def executed(self, name: str, duration: float) -> None:
+        if self.enabled:
+            with self._lock:
+                metrics = self._get(name)
+                metrics.runs += 1
+                metrics.duration.observe(duration)
+
+    def failed(self, name: str, recipient: bool = False) -> None:
+        if self.enabled:
+            with self._lock:
+                if recipient:
+                    self._get(name).recipient_errors += 1
+                else:
+                    self._get(name).errors += 1
+
+    def skipped(self, name: str) -> None:
+        if self.enabled:
+            with self._lock:
+                self._get(name).skipped += 1
+
+    def misfired(self, name: str) -> None:
+        if self.enabled:
+            with self._lock:
+                self._get(name).misfired += 1
+
+    def snapshot(self, name: str = None) -> dict:
+        """
+        The metrics as a dict, by Job name, or the
+        metrics of the Jobs with the given name.
+        """
+        with self._lock:
+            if name is not None:
+                return self._get(name).snapshot() if name in self._jobs else {}
+            return {name: metrics.snapshot() for name, metrics in self._jobs.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._jobs.clear()
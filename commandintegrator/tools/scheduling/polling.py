@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from commandintegrator.tools.pollcache import PollCache
+from commandintegrator.tools.scheduling.components import Job
+from commandintegrator.tools.scheduling.jobstore import JobRecord
+
+
+class PollingJob(Job):
+    """
+    PollingJob class
+
+    Job which passes the result of its function through
+    a PollCache, and only passes it on to the recipient
+    when it changed. Executions that give nothing new
+    end there, without waking the recipient.
+
+    With a max_interval, the interval of the TimeTrigger
+    adapts to the data: it is multiplied by 'backoff' for
+    each execution that gave nothing new, up to the
+    max_interval, and goes back to the interval in 'every'
+    as soon as something changed.
+    """
+
+    def __init__(self, *args, cache: PollCache = None,
+                 max_interval: timedelta = None, backoff: float = 2.0, **kwargs):
+        """
+        See Job for the other arguments.
+
+        :param cache: PollCache, in which the results are
+                      compared. A PollCache of its own if
+                      omitted.
+        :param max_interval: timedelta, longest interval the
+                             TimeTrigger backs off to. The
+                             interval is not adapted if omitted.
+        :param backoff: float, factor by which the interval
+                        grows for each execution without change
+        """
+        super().__init__(*args, **kwargs)
+        self.cache = cache if cache is not None else PollCache()
+        self.min_interval = self.trigger.timedelta_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        if max_interval is not None:
+            if self.min_interval is None:
+                raise ValueError("'max_interval' requires an interval in 'every'")
+            if max_interval < self.min_interval:
+                raise ValueError("'max_interval' can not be shorter than the interval in 'every'")
+            if backoff <= 1:
+                raise ValueError("'backoff' must be greater than 1")
+
+    def __repr__(self):
+        return f"Polling{super().__repr__()}"
+
+    @property
+    def interval(self) -> timedelta:
+        """
+        The current interval of the TimeTrigger
+        """
+        return self.trigger.timedelta_interval
+
+    def _has_output(self) -> bool:
+        """
+        Compare the result to the cache, and keep what
+        the PollCache gives, the changes with
+        compare="diff", as the result.
+        """
+        changes = self.cache.check(self.func, self.result)
+        self._adapt(changes is not None)
+        if changes is None:
+            return False
+        self.result = changes
+        return True
+
+    def _adapt(self, changed: bool) -> None:
+        if self.max_interval is None or self.engine is None or not self.alive:
+            return
+        if changed:
+            interval = self.min_interval
+        else:
+            interval = min(self.interval * self.backoff, self.max_interval)
+        if interval != self.interval:
+            self.engine.reschedule(self, interval)
+
+    def record(self) -> JobRecord:
+        record = super().record()
+        if "poll" not in record.options:
+            record.options["poll"] = dict(
+                max_interval=f"{self.max_interval.total_seconds()}s" if self.max_interval else None,
+                backoff=self.backoff,
+                compare=self.cache.compare,
+                silent_first_call=self.cache.silent_first_call)
+        return record
@@ -0,0 +1,137 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import commandintegrator
+
+
+class OverlapGuard:
+    """
+    OverlapGuard class
+
+    Keeps count of the executions of each Job that are
+    running or waiting, and decides what happens when a
+    Job is triggered while it is still executing, by the
+    overlap policy of the Job:
+
+        "skip":       the firing is dropped
+        "queue":      the firing is executed once the
+                      running execution returns. At most
+                      'max_queued' firings are kept waiting,
+                      later ones are dropped.
+        "concurrent": the firing is executed alongside the
+                      running ones, up to 'max_instances'
+                      executions at once. Later firings
+                      are dropped.
+    """
+    RUN = "run"
+    QUEUE = "queue"
+    SKIP = "skip"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}
+        self._queued = {}
+
+    def admit(self, job) -> str:
+        """
+        Take a slot for an execution of the Job.
+        :param job: Job instance
+        :returns: str, OverlapGuard.RUN if the Job is to be
+                  executed now, OverlapGuard.QUEUE if it will be
+                  executed when a running execution returns, or
+                  OverlapGuard.SKIP if the firing is dropped.
+        """
+        with self._lock:
+            active = self._active.get(job, 0)
+            if not active or (job.overlap == "concurrent" and active < job.max_instances):
+                self._active[job] = active + 1
+                return OverlapGuard.RUN
+            if job.overlap == "queue" and self._queued.get(job, 0) < job.max_queued:
+                self._queued[job] = self._queued.get(job, 0) + 1
+                return OverlapGuard.QUEUE
+            return OverlapGuard.SKIP
+
+    def release(self, job) -> bool:
+        """
+        Release the slot of an execution that returned.
+        :param job: Job instance
+        :returns: bool, True if a queued firing is to be
+                  executed in the released slot
+        """
+        with self._lock:
+            if (queued := self._queued.get(job, 0)) and job.alive:
+                if queued == 1:
+                    del self._queued[job]
+                else:
+                    self._queued[job] = queued - 1
+                return True
+            self._queued.pop(job, None)
+            if (active := self._active[job]) == 1:
+                del self._active[job]
+            else:
+                self._active[job] = active - 1
+            return False
+
+    def is_idle(self, job) -> bool:
+        """
+        Whether the Job has no execution running or waiting
+        """
+        with self._lock:
+            return job not in self._active and job not in self._queued
+
+
+class JobPool:
+    """
+    JobPool class
+
+    Bounded pool of worker threads executing the Jobs
+    of a SchedulerEngine. The amount of workers is the
+    global limit of Jobs executing at once, firings in
+    excess wait for a free worker. The limit per Job and
+    what happens to overlapping firings is decided by an
+    OverlapGuard, from the overlap policy of each Job.
+    """
+
+    def __init__(self, max_workers: int = None):
+        """
+        :param max_workers: int, global limit of Jobs executing
+                            at once. Defaults to the default of
+                            ThreadPoolExecutor.
+        """
+        self.max_workers = max_workers
+        self.guard = OverlapGuard()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="JobPool")
+
+    def __repr__(self):
+        return f"JobPool(max_workers={self.max_workers})"
+
+    def submit(self, job, on_done: Callable) -> str:
+        """
+        Execute the Job on a worker, if admitted by the
+        overlap policy of the Job.
+        :param job: Job instance
+        :param on_done: callable, called with the Job and
+                        the bool returned by Job.execute delay
+                        every execution
+        :returns: str, the OverlapGuard decision
+        """
+        if (decision := self.guard.admit(job)) == OverlapGuard.RUN:
+            self._executor.submit(self._execute, job, on_done)
+        return decision
+
+    def _execute(self, job, on_done: Callable) -> None:
+        rerun = True
+        while rerun:
+            ok = False
+            try:
+                ok = job.execute()
+            except Exception as e:
+                commandintegrator.logger.log(f"JobPool could not execute job "
+                                             f"'{job.func_name}': {type(e).__name__}('{e}')",
+                                             level="error")
+            rerun = self.guard.release(job)
+            on_done(job, ok)
+
+    def is_idle(self, job) -> bool:
+        return self.guard.is_idle(job)
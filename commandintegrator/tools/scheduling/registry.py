@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Tuple
+
+
+class JobRegistry:
+    """
+    JobRegistry class
+
+    Keeps the Jobs of the scheduler, indexed by their
+    native_id, by their name and by their state:
+
+        "pending": not started
+        "running": started, and to be triggered again
+        "done":    finished, as killed or by not being
+                   reoccurring
+        "failed":  finished, with its last execution failed
+
+    Jobs notify the registry as they change state, so
+    every lookup by id, name or state is a lookup in a
+    dict, and unregistering a Job is O(1). Finished Jobs
+    are unregistered automatically, once they have been
+    finished for 'retention' seconds.
+
+    The registry also keeps the running Jobs in a heap by
+    their next trigger, from which 'upcoming' returns the
+    Jobs that are to be triggered the soonest.
+    """
+    states = ("pending", "running", "done", "failed")
+
+    def __init__(self, retention: float = 600):
+        """
+        :param retention: float, seconds that finished Jobs are
+                          kept. They are kept until unregistered
+                          if None.
+        """
+        self.retention = retention
+        self._lock = threading.RLock()
+        self._by_id: Dict[int, object] = {}
+        self._by_name: Dict[str, Dict[int, object]] = {}
+        self._by_state: Dict[str, Dict[int, object]] = {state: {} for state in self.states}
+        self._state: Dict[int, str] = {}
+        self._finished: Dict[int, Tuple[float, object]] = {}
+        self._upcoming = []
+        self._deadlines: Dict[int, float] = {}
+        self._sequence = itertools.count()
+
+    def __repr__(self):
+        return f"JobRegistry(" + ", ".join(f"{state}={len(jobs)}" for state, jobs
+                                           in self._by_state.items()) + ")"
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, job) -> bool:
+        return job.native_id in self._by_id
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def register(self, job) -> None:
+        """
+        Add the Job to the registry. The Job notifies the
+        registry of its changes in state from then on.
+        :param job: Job instance
+        """
+        with self._lock:
+            self._by_id[job.native_id] = job
+            self._by_name.setdefault(job.func_name, {})[job.native_id] = job
+            job.registry = self
+            self._index(job)
+            self.evict()
+
+    def unregister(self, job) -> None:
+        """
+        Remove the Job from the registry. It is not
+        killed, see Job.kill_gracefully for that.
+        :param job: Job instance
+        """
+        with self._lock:
+            if self._by_id.pop(job.native_id, None) is None:
+                return
+            jobs = self._by_name[job.func_name]
+            del jobs[job.native_id]
+            if not jobs:
+                del self._by_name[job.func_name]
+            del self._by_state[self._state.pop(job.native_id)][job.native_id]
+            self._deadlines.pop(job.native_id, None)
+            self._finished.pop(job.native_id, None)
+            if job.registry is self:
+                job.registry = None
+
+    def update(self, job) -> None:
+        """
+        Called by the Job when it is started, triggered
+        or finished, to keep the indexes up to date.
+        :param job: Job instance
+        """
+        with self._lock:
+            if job.native_id in self._by_id:
+                self._index(job)
+            self.evict()
+
+    def _index(self, job) -> None:
+        state = job.state
+        if (previous := self._state.get(job.native_id)) != state:
+            if previous is not None:
+                del self._by_state[previous][job.native_id]
+            self._by_state[state][job.native_id] = job
+            self._state[job.native_id] = state
+            if state in ("done", "failed") and self.retention is not None:
+                self._finished[job.native_id] = (time.monotonic(), job)
+        if state == "running" and self._deadlines.get(job.native_id) != job.trigger.deadline:
+            self._deadlines[job.native_id] = job.trigger.deadline
+            heapq.heappush(self._upcoming, (job.trigger.deadline, next(self._sequence), job))
+            if len(self._upcoming) > 2 * len(self._by_state["running"]) + 64:
+                # Drop the entries of earlier triggers
+                self._upcoming = [entry for entry in self._upcoming if self._is_upcoming(entry)]
+                heapq.heapify(self._upcoming)
+
+    def _is_upcoming(self, entry: tuple) -> bool:
+        deadline, _, job = entry
+        return self._state.get(job.native_id) == "running" and job.trigger.deadline == deadline
+
+    def evict(self) -> None:
+        """
+        Unregister the Jobs that have been finished
+        for longer than the retention
+        """
+        if self.retention is None:
+            return
+        with self._lock:
+            expired = time.monotonic() - self.retention
+            # Ordered by the time of finishing, as the dict keeps its insertion order
+            while self._finished:
+                finished, job = next(iter(self._finished.values()))
+                if finished > expired:
+                    break
+                self.unregister(job)
+
+    def get(self, job_id: int):
+        """
+        :returns: Job instance, or None
+        """
+        return self._by_id.get(job_id)
+
+    def by_name(self, name: str) -> Tuple:
+        with self._lock:
+            return tuple(self._by_name.get(name, {}).values())
+
+    def by_state(self, state: str, name: str = None) -> Tuple:
+        """
+        :param state: str, "pending", "running", "done" or "failed"
+        :param name: str, only Jobs with this name, if given
+        """
+        if state not in self.states:
+            raise ValueError(f"'{state}' is an invalid job state")
+        with self._lock:
+            jobs = self._by_state[state]
+            if name is None:
+                return tuple(jobs.values())
+            return tuple(job for job_id, job in self._by_name.get(name, {}).items()
+                         if job_id in jobs)
+
+    def all(self) -> Tuple:
+        with self._lock:
+            return tuple(self._by_id.values())
+
+    def upcoming(self, amount: int = 1) -> Tuple:
+        """
+        The running Jobs that are to be triggered the soonest
+        :param amount: int, most Jobs returned
+        :returns: tuple, soonest first
+        """
+        with self._lock:
+            jobs, kept = [], []
+            while self._upcoming and len(jobs) < amount:
+                entry = heapq.heappop(self._upcoming)
+                if self._is_upcoming(entry):
+                    jobs.append(entry[2])
+                    kept.append(entry)
+            for entry in kept:
+                heapq.heappush(self._upcoming, entry)
+            return tuple(jobs)
@@ -0,0 +1,142 @@
+import random
+import threading
+import time
+from typing import Dict, Tuple, Type
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker class
+
+    Stops executing the Jobs of a name for a while, once
+    'threshold' of their executions in a row have failed.
+    An execution counts once, as failed when its retries
+    are exhausted, not for each of its attempts:
+
+        "closed":    executions are allowed
+        "open":      executions are skipped, until 'reset_timeout'
+                     seconds have passed since it opened
+        "half_open": one execution is allowed, which closes
+                     the breaker if it succeeds, and opens it
+                     again if it fails
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self._opened = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"CircuitBreaker(state={self.state}, failures={self.failures})"
+
+    def allow(self) -> bool:
+        """
+        Whether an execution may be made now
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return False
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self.state = "open"
+                self._opened = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    RetryPolicy class
+
+    Decides how a Job retries its function when it raises,
+    before the execution is given up on. The recurring
+    schedule of the Job is kept either way, the next
+    firing is executed as usual.
+
+    The delay before each retry grows exponentially from
+    'backoff' by 'factor', up to 'max_backoff', with up to
+    'jitter' of it added at random. Retries are made on the
+    worker of the execution, which keeps the execution going
+    and subject to the overlap policy of the Job meanwhile.
+
+    With a 'breaker_threshold', the Jobs of a name that use
+    the policy share a CircuitBreaker, which skips their
+    firings for 'breaker_reset' seconds delay that many
+    failed executions in a row.
+    """
+
+    def __init__(self, max_attempts: int = 3, backoff: float = 1.0,
+                 factor: float = 2.0, max_backoff: float = 60.0,
+                 jitter: float = 0.1, retry_on: Tuple[Type[Exception], ...] = (Exception,),
+                 breaker_threshold: int = None, breaker_reset: float = 60.0):
+        """
+        :param max_attempts: int, attempts per execution, the
+                             first one included
+        :param backoff: float, seconds before the first retry
+        :param factor: float, growth of the delay per retry
+        :param max_backoff: float, longest delay before a retry
+        :param jitter: float, share of the delay added at random
+        :param retry_on: tuple, the exceptions that are retried,
+                         others give up on the execution right away
+        :param breaker_threshold: int, failed executions in a row
+                                  that open the CircuitBreaker of the
+                                  name. No circuit breaking if omitted.
+        :param breaker_reset: float, seconds the CircuitBreaker stays
+                              open before an execution is tried again
+        """
+        if max_attempts < 1:
+            raise ValueError("'max_attempts' must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on = retry_on
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RetryPolicy(" \
+               f"max_attempts={self.max_attempts}, " \
+               f"backoff={self.backoff}, " \
+               f"factor={self.factor}, " \
+               f"breaker_threshold={self.breaker_threshold})"
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before the retry following the
+        given attempt, counting from 1.
+        """
+        delay = min(self.backoff * self.factor ** (attempt - 1), self.max_backoff)
+        return delay + delay * random.uniform(0, self.jitter)
+
+    def should_retry(self, attempt: int, error: Exception) -> bool:
+        return attempt < self.max_attempts and isinstance(error, self.retry_on)
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """
+        The CircuitBreaker of the Jobs with the given
+        name, or None without a breaker_threshold.
+        """
+        if self.breaker_threshold is None:
+            return None
+        with self._lock:
+            if (breaker := self._breakers.get(name)) is None:
+                breaker = self._breakers[name] = CircuitBreaker(self.breaker_threshold,
+                                                                self.breaker_reset)
+            return breaker
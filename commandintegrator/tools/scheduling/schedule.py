@@ -1,13 +1,19 @@
+import atexit
 import functools
 import inspect
 from datetime import datetime
-from queue import Queue
 from typing import Dict, Generator, Any, Callable, Tuple
 
-from multidict import MultiDict
-
 from commandintegrator.core.decorators import Logger
+from commandintegrator.tools.pollcache import PollCache
+from commandintegrator.tools.scheduling.channels import JobOutput, OutputChannel
 from commandintegrator.tools.scheduling.components import Job, TimeTrigger
+from commandintegrator.tools.scheduling.engine import SchedulerEngine, AsyncioSchedulerEngine
+from commandintegrator.tools.scheduling.jobstore import JobRecord, JobStore, reference, resolve
+from commandintegrator.tools.scheduling.metrics import SchedulerMetrics
+from commandintegrator.tools.scheduling.polling import PollingJob
+from commandintegrator.tools.scheduling.registry import JobRegistry
+from commandintegrator.tools.scheduling.retry import RetryPolicy
 
 
 # noinspection PyPep8Naming
@@ -21,27 +27,104 @@ class schedule:
     'method' method as @Schedule.method,
     or by calling Schedule.run() withr
     provided args.
+
+    Jobs are run by the SchedulerEngine in
+    'engine', on a single scheduling thread and
+    a bounded pool of worker threads. Use 
+    'set_max_workers' to set the global limit of
+    Jobs executing at once. Jobs with a coroutine
+    function or recipient are run by the 
+    AsyncioSchedulerEngine in 'async_engine', on a
+    single event loop. Use 'use_event_loop' to run 
+    them on the loop of the host application.
+
+    The rules of Jobs are in the naive local time
+    of the system, unless a timezone is given per Job
+    or set as default in 'timezone'.
+
+    With a JobStore, given with 'use_job_store', the
+    state of the Jobs is saved as they are triggered,
+    and the Jobs are restored when the application
+    is started again.
+
+    Jobs are kept in the JobRegistry in 'registry',
+    which unregisters finished Jobs delay the retention
+    in 'registry.retention'.
+
+    The lateness and duration of executions, and the
+    amount of runs, errors and skipped firings of the
+    Jobs by name are collected in 'metrics', see
+    'get_metrics'.
+
+    Errors do not stop reoccurring Jobs. Failed executions
+    are retried by the RetryPolicy given per Job, or the
+    default one in 'retry_policy'.
+
+    Jobs that only pass on results that changed, at an
+    interval that adapts to how often they change, are
+    scheduled with 'poll'.
+
+    The outputs of Jobs without a recipient are put as
+    JobOutput objects in a bounded OutputChannel: the
+    one given to the Job, the one opened for its name
+    with 'open_channel', or the default 'outputs'.
     """
-    id_job_map: Dict[int, Job] = {}
-    name_job_map: MultiDict[str, Job] = MultiDict()
-    outputs: Queue[Job] = Queue()
+    registry: JobRegistry = JobRegistry()
+    metrics: SchedulerMetrics = SchedulerMetrics()
+    retry_policy: RetryPolicy = None
+    outputs: OutputChannel = OutputChannel()
+    channels: Dict[str, OutputChannel] = {}
+    engine: SchedulerEngine = SchedulerEngine()
+    async_engine: AsyncioSchedulerEngine = AsyncioSchedulerEngine()
+    timezone: str = None
+    job_store: JobStore = None
+    catch_up: str = "once"
+    _stored: Dict[str, JobRecord] = {}
 
     @staticmethod
     def method(func, at: str=None, every: str=None,
                delay=None, exactly_at: datetime=None,
                recipient: Callable=None, start_now=True,
-               **kwargs):
+               overlap: str="queue", max_instances: int=1,
+               max_queued: int=1, misfire: str="run",
+               misfire_grace: float=None, cron: str=None,
+               jitter: float=None, timezone: str=None, key: str=None,
+               output_channel: OutputChannel=None, retry: RetryPolicy=None,
+               job_type: Callable=Job, **kwargs):
         """
         Registers a new schedule Job.
 
         @param func: Callable to be scheduled - unbound or bound, sync or async
         @param at: str, Timestamp for execution, "HH:MM" ("HH:MM:SS optionally)
-        @param every: str Options: monday -> friday, day, hour, minute, second
+        @param every: str Options: monday -> friday, day, hour, minute, second,
+                      or an interval such as "250ms" or "15 minutes"
         @param delay: str, Delay execution, "HH:MM:SS" ("HH:MM:SS optionally)
         @param exactly_at: datetime object, Exact point in time for execution
         @param recipient: callable to which the job output will be passed to
         @param start_now: Start the job now, default: True. If not,
                           see schedule.unstarted
+        @param overlap: str, what to do when the job is triggered while
+                        still executing: "skip", "queue" (default) or
+                        "concurrent". See OverlapGuard.
+        @param max_instances: int, executions at once with "concurrent"
+        @param max_queued: int, firings kept waiting with "queue"
+        @param misfire: str, "run" (default) or "skip" firings that are
+                        later than misfire_grace seconds
+        @param misfire_grace: float, seconds a firing may be late
+        @param cron: str, cron expression, "*/15 9-17 * * mon-fri" for instance
+        @param jitter: float, seconds of random delay added to each firing
+        @param timezone: str, timezone of 'at', the days and 'cron', such as
+                         "Europe/Stockholm". Defaults to schedule.timezone
+        @param key: str, key of the job in the job store, unique among the
+                    scheduled jobs. Defaults to the module and qualified
+                    name of 'func' with the kwargs, see schedule.default_key.
+        @param output_channel: OutputChannel for the outputs of the job when
+                               it has no recipient. Defaults to the channel
+                               opened for its name, or schedule.outputs.
+        @param retry: RetryPolicy, retries with backoff and circuit breaking
+                      when func raises. Defaults to schedule.retry_policy
+        @param job_type: the Job class, or a callable creating the Job
+                         with the same arguments. See schedule.poll
         @param kwargs: kwargs, passed to the function in 'func' when creating
                        the partial function which is then passed to the Job
         @return: None
@@ -52,30 +135,230 @@ class schedule:
         # Create a TimeTrigger for the Job
         trigger = TimeTrigger(every=every, at=at,
                               delay=delay,
-                              exactly_at=exactly_at)
+                              exactly_at=exactly_at,
+                              cron=cron,
+                              jitter=jitter,
+                              timezone=timezone or schedule.timezone)
 
         if not (recipient := recipient):
-            recipient = schedule.schedule_default_catcher
+            if output_channel is not None:
+                recipient = functools.partial(schedule.schedule_default_catcher,
+                                              output_channel=output_channel)
+            else:
+                recipient = schedule.schedule_default_catcher
             return_self = True
 
-        job = Job(func=functools.partial(func, **kwargs),
-                  is_async=inspect.iscoroutinefunction(func),
+        is_async = inspect.iscoroutinefunction(func)
+        if is_async or inspect.iscoroutinefunction(recipient):
+            engine = schedule.async_engine
+        else:
+            engine = schedule.engine
+
+        job = job_type(func=functools.partial(func, **kwargs),
+                  is_async=is_async,
                   trigger=trigger,
                   recipient=recipient,
                   func_name=func.__name__,
-                  return_self=return_self)
+                  return_self=return_self,
+                  engine=engine,
+                  overlap=overlap,
+                  max_instances=max_instances,
+                  max_queued=max_queued,
+                  misfire=misfire,
+                  misfire_grace=misfire_grace,
+                  kwargs=kwargs,
+                  key=key or schedule.default_key(func, kwargs),
+                  store=schedule.job_store,
+                  metrics=schedule.metrics,
+                  retry=retry or schedule.retry_policy)
+
+        if any(other.key == job.key and other.alive and other.state in ("pending", "running")
+               for other in schedule.registry.all()):
+            raise ValueError(f"A job with the key '{job.key}' is already scheduled, "
+                             f"give the job a 'key' of its own")
+
+        if schedule.job_store is not None and not schedule._restore(job):
+            Logger.log(f"Scheduler will not start job {job}, its trigger "
+                       f"was pulled before the application was restarted",
+                       level="info")
+            return
 
-        # Map job in schedule and start it
+        # Register the job in the schedule
         Logger.log(f"Scheduler created job {job}", level="info")
-        schedule.name_job_map.add(job.func_name, job)
-        schedule.id_job_map[job.native_id] = job
+        schedule.registry.register(job)
 
         # Start the job, or add it to unstarted for later starts
         if start_now:
             job.start()
 
     @staticmethod
-    def schedule_default_catcher(job: Job) -> None:
+    def default_key(func: Callable, kwargs: dict = None) -> str:
+        """
+        The key of a job in the job store, when none is given.
+        Module level functions are keyed by their import
+        reference, "module:qualname", along with the kwargs,
+        so that jobs of the same function with other kwargs
+        are kept apart:
+
+            "tasks:add_numbers(x=1, y=2)"
+
+        Bound methods and functions that can not be imported,
+        such as lambdas, are also keyed by the id of their
+        instance or of themselves. Their keys differ between
+        runs of the application, give them a key to have them
+        take on their saved state when scheduled again.
+
+        @param func: the scheduled callable
+        @param kwargs: dict, the kwargs passed to func
+        @return: str
+        """
+        if (key := reference(func)) is None:
+            key = f"{getattr(func, '__module__', None)}:" \
+                  f"{getattr(func, '__qualname__', type(func).__qualname__)}" \
+                  f"@{id(getattr(func, '__self__', func)):x}"
+        if kwargs:
+            key += "(" + ", ".join(f"{name}={value!r}" for name, value in sorted(kwargs.items())) + ")"
+        return key
+
+    @staticmethod
+    def poll(func, every: str=None, max_interval=None, backoff: float=2.0,
+             compare: str="value", silent_first_call: bool=False,
+             cache: PollCache=None, **kwargs):
+        """
+        Registers a new schedule PollingJob, which polls
+        func and only passes its result on to the recipient,
+        or the output channel, when it changed. Unchanged
+        results do not reach the recipient at all.
+
+        With a max_interval, the interval in 'every' backs off
+        by 'backoff' for each poll that gave nothing new, up to
+        max_interval, and is restored as soon as the result
+        changes.
+
+        @param func: Callable to be polled - unbound or bound, sync or async
+        @param every: str, the interval of the polls, see schedule.method
+        @param max_interval: str or timedelta, longest interval to back
+                             off to, "10 minutes" for instance. The
+                             interval is fixed if omitted.
+        @param backoff: float, factor by which the interval grows for
+                        each poll without change
+        @param compare: str, "value", "digest" or "diff", see PollCache
+        @param silent_first_call: bool, do not pass on the first result
+        @param cache: PollCache to compare the results in. The job gets
+                      one of its own if omitted, with 'compare' and
+                      'silent_first_call'.
+        @param kwargs: the other arguments of schedule.method, and the
+                       kwargs passed to the function in 'func'
+        @return: None
+        """
+        if cache is None:
+            cache = PollCache(silent_first_call, compare=compare)
+        if max_interval is not None:
+            max_interval = TimeTrigger.parse_interval(max_interval)
+        schedule.method(func, every=every,
+                        job_type=functools.partial(PollingJob, cache=cache,
+                                                   max_interval=max_interval,
+                                                   backoff=backoff),
+                        **kwargs)
+
+    @staticmethod
+    def _restore(job: Job) -> bool:
+        """
+        Continue from the saved state of the Job, if
+        there is any, and save its current state.
+        :returns: bool, False if the Job will not be triggered
+        """
+        if (record := schedule._stored.pop(job.key, None)) is not None:
+            if record.options.get("rules") != job.record().options["rules"]:
+                # The rules have changed since the state was saved
+                job.trigger.amount_of_runs = record.amount_of_runs
+                job.trigger.last_trigger = record.last_trigger
+            elif not job.trigger.restore(record.amount_of_runs, record.last_trigger,
+                                         record.slot, schedule.catch_up):
+                schedule.job_store.remove(job.key)
+                return False
+        job.persist()
+        return True
+
+    @staticmethod
+    def use_job_store(store: JobStore, catch_up: str = "once") -> int:
+        """
+        Save the state of Jobs in the given JobStore, and
+        restore the Jobs saved in it. Every saved Job is
+        loaded at once. Jobs with a module level function
+        are recreated and started, others take on their
+        saved state when they are scheduled again with the
+        same key. The store is closed when the application
+        exits.
+
+        :param store: JobStore, SQLiteJobStore for instance
+        :param catch_up: str, what to do with the firings that
+                         were missed while the application was
+                         not running: "skip", "once" or "all".
+                         See TimeTrigger.restore.
+        :returns: int, amount of Jobs recreated
+        """
+        if catch_up not in TimeTrigger.catch_up_policies:
+            raise ValueError(f"'{catch_up}' is an invalid value for 'catch_up'")
+        schedule.job_store = store
+        schedule.catch_up = catch_up
+        schedule._stored = store.load()
+        atexit.register(store.close)
+
+        restored = 0
+        scheduled = {job.key for job in schedule.get_all_jobs()}
+        for record in list(schedule._stored.values()):
+            if record.func is None or record.options.get("kwargs") is None \
+                    or record.key in scheduled:
+                continue
+            try:
+                func = resolve(record.func)
+                recipient = resolve(record.recipient) if record.recipient else None
+            except (ImportError, AttributeError) as e:
+                Logger.log(f"Scheduler could not restore job '{record.key}': "
+                           f"{type(e).__name__}('{e}')", level="error")
+                continue
+            options = dict(record.options)
+            rules, kwargs = options.pop("rules"), options.pop("kwargs")
+            if rules.get("exactly_at"):
+                rules["exactly_at"] = datetime.fromisoformat(rules["exactly_at"])
+            if (poll := options.pop("poll", None)) is not None:
+                schedule.poll(func, recipient=recipient, key=record.key,
+                              **rules, **options, **poll, **kwargs)
+            else:
+                schedule.method(func, recipient=recipient, key=record.key,
+                                **rules, **options, **kwargs)
+            restored += 1
+        return restored
+
+    @staticmethod
+    def set_max_workers(max_workers: int) -> None:
+        """
+        Set the global limit of Jobs executing at once.
+        Applies to Jobs created delay the call.
+
+        :param max_workers: int, amount of worker threads for
+                            synchronous Jobs, and of tasks for
+                            Jobs with coroutines
+        """
+        schedule.engine = SchedulerEngine(max_workers)
+        schedule.async_engine = AsyncioSchedulerEngine(schedule.async_engine._loop, max_workers)
+
+    @staticmethod
+    def use_event_loop(loop) -> None:
+        """
+        Run Jobs with coroutine functions or recipients
+        on the given event loop, typically the one of the
+        host application, instead of on a loop of the
+        scheduler's own. Applies to Jobs created delay
+        the call.
+
+        :param loop: asyncio event loop
+        """
+        schedule.async_engine = AsyncioSchedulerEngine(loop, schedule.async_engine.max_tasks)
+
+    @staticmethod
+    def schedule_default_catcher(job: Job, output_channel: OutputChannel = None) -> None:
         """
         This is the default method for return values of
         schedule jobs, if no recipient is specified
@@ -83,45 +366,58 @@ class schedule:
 
         All Jobs without a designated recipient
         callable will have their return value end
-        up in this method which maps their return
-        value with themselves as source, in a dict object
-        and stored in the public accessible queue "outputs".
+        up in this method which puts it in a JobOutput,
+        along with the id, name and run of the Job, in
+        the given channel, the channel opened for the
+        name of the Job, or the public accessible channel
+        "outputs".
 
         :param job: Job instance which has been executed
                     at least once
+        :param output_channel: OutputChannel of the Job
+        """
+        if output_channel is None:
+            output_channel = schedule.channels.get(job.func_name, schedule.outputs)
+        output_channel.put(JobOutput.of(job))
+
+    @staticmethod
+    def open_channel(name: str, maxsize: int = 1000, policy: str = "drop_oldest",
+                     timeout: float = None) -> OutputChannel:
         """
-        schedule.outputs.put(job)
+        Open a channel for the outputs of the Jobs with the
+        given name, instead of the default 'outputs'. Opening
+        it again returns the open channel.
+        See OutputChannel for the arguments.
+        :returns: OutputChannel
+        """
+        if (channel := schedule.channels.get(name)) is None:
+            channel = schedule.channels[name] = OutputChannel(maxsize, policy, timeout)
+        return channel
 
     @staticmethod
     def get_jobs(job_name: str = None, job_id: int = None) -> \
             Generator[Job, Any, None]:
         """
         Returns Job instance(s) that matches provided
-        args. Since many jobs can share the same name,
-        multidict is used when mapping against its name.
-        Their native_id is unique however, thus a regular
-        dict is used for mapping jobs against their native_id.
-
+        args. Many jobs can share the same name, their
+        native_id is unique however. Both are looked
+        up in the indexes of schedule.registry. None
+        is yielded if there is no match.
 
         :param job_name: str, name of the job to return (optional)
         :param job_id: int, id of the job to return (optional
         :rtype: Job instance
         :raises: ValueError, if both name and id are None
         """
-        if job_name is None and id is None:
+        if job_name is None and job_id is None:
             raise ValueError("either job_name or job_id must be specified")
 
         if job_name:
-            try:
-                for job in schedule.name_job_map.getall(job_name):
-                    yield job
-            except KeyError:
+            if not (jobs := schedule.registry.by_name(job_name)):
                 yield
+            yield from jobs
         elif job_id:
-            try:
-                yield schedule.id_job_map[int(job_id)]
-            except KeyError:
-                yield
+            yield schedule.registry.get(int(job_id))
 
     @staticmethod
     def kill_job_gracefully(job_name=None, job_id=None):
@@ -131,17 +427,25 @@ class schedule:
         :param job_id: int, id of the job
         """
         for job in schedule.get_jobs(job_name, job_id):
-            job.kill_gracefully()
+            if job is not None:
+                job.kill_gracefully()
 
     @staticmethod
     def get_all_jobs() -> Generator[Job, Any, None]:
         """
-        Returns all jobs, in name_job_map and id_job_map
-        combined.
+        Returns all jobs in schedule.registry
         :rtype: Job
         """
-        for i in schedule.name_job_map.values():
-            yield i
+        yield from schedule.registry.all()
+
+    @staticmethod
+    def get_metrics(job_name: str = None) -> dict:
+        """
+        Returns a snapshot of the metrics of the jobs,
+        by name, or of the jobs with the given name.
+        See SchedulerMetrics.
+        """
+        return schedule.metrics.snapshot(job_name)
 
     @staticmethod
     def has_outputs() -> bool:
@@ -149,25 +453,26 @@ class schedule:
         Returns whether there are outputs in
         the output queue 'schedule.outputs'
         """
-        return bool(schedule.outputs.qsize())
+        return not schedule.outputs.empty()
 
     @staticmethod
-    def get_latest_output():
-        return schedule.outputs.get()
+    def get_latest_output(block: bool = True, timeout: float = None) -> JobOutput:
+        """
+        Take the oldest output in 'schedule.outputs'
+        :raises: queue.Empty, if not blocking and there
+                 are no outputs, or on timeout
+        """
+        return schedule.outputs.get(block, timeout)
 
     @staticmethod
     def get_unstarted_jobs(name: str = None) -> Tuple[Job]:
         """
-        Returns collection of all jobs that are not
-        running at the moment.
+        Returns collection of all jobs that have
+        not been started.
         @param name: Job name (may return multiple)
         @return: Tuple with Jobs
         """
-        if name:
-            return tuple([i for i in schedule.get_jobs(name)
-                          if i.running is False])
-        return tuple([i for i in schedule.get_all_jobs()
-                      if i.running is False])
+        return schedule.registry.by_state("pending", name)
 
     @staticmethod
     def start_job(name: str) -> bool:
@@ -177,5 +482,5 @@ class schedule:
         @param name: Name of the job to start (may start multiple)
         @return: bool, jobs were or were not started
         """
-        return bool([job.start() for job in list(schedule.get_jobs(name))])
+        return bool([job.start() for job in schedule.get_unstarted_jobs(name)])
 
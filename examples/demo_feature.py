@@ -104,13 +104,10 @@ if __name__ == '__main__':
         """
         life, is, like, a, box, of, chocolates
         """
-        message.content = message.content[1:]
-        print(message.content)
+        words = message.content[1:]
+        print(words)
 
-        for i in message.content:
-            stripped = i.strip(ci.CommandParser.IGNORED_CHARS)
-
-        msg = str(' ').join(message.content)
+        msg = str(' ').join(words)
         headers = {'text': msg}
         res = vulcan_api_handle.post(headers)
         return str().join(res['contents']['translated'])
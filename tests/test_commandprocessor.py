@@ -0,0 +1,212 @@
+import asyncio
+import time
+import logging
+from unittest import TestCase
+from unittest.mock import patch
+
+import commandintegrator as ci
+from commandintegrator.core import configuration
+
+
+def get_time():
+    return "time"
+
+
+def get_weather():
+    return "weather"
+
+
+async def get_time_async():
+    return "async time"
+
+
+def get_time_slowly():
+    time.sleep(0.5)
+    return "slow time"
+
+
+class ShoutingCommandParser(ci.CommandParser):
+    def is_contender_for_processing(self, message: ci.Message) -> bool:
+        return any(word.isupper() for word in message.content)
+
+
+class TestCommandProcessor(TestCase):
+
+    def setUp(self) -> None:
+        self.clock = ci.Feature(name="ClockFeature")
+        self.clock.command_parser = ci.CommandParser(
+            keywords=("time", "clock"),
+            callbacks=ci.Callback("time", get_time))
+
+        self.weather = ci.Feature(name="WeatherFeature")
+        self.weather.command_parser = ci.CommandParser(
+            keywords=("weather", "time"),
+            callbacks=ci.Callback("weather", get_weather))
+
+        self.processor = ci.CommandProcessor()
+        self.processor.features = (self.weather, self.clock)
+
+    def test_routes_through_keyword_index(self):
+        interpretation = self.processor.process(ci.Message(content="How is the weather?"))
+        self.assertEqual(interpretation.response(), "weather")
+
+    def test_keeps_feature_order_for_shared_keywords(self):
+        interpretation = self.processor.process(ci.Message(content="What TIME is it?"))
+        self.assertEqual(interpretation.response(), "time")
+
+    def test_unmatched_message_gets_default_response(self):
+        interpretation = self.processor.process(ci.Message(content="hello there"))
+        self.assertIsNone(interpretation.feature_name)
+        self.assertIn(interpretation.response(),
+                      ci.CommandProcessor.DEFAULT_RESPONSES["NoResponse"])
+
+    def test_overloaded_parser_is_asked_directly(self):
+        shouting = ci.Feature(name="ShoutingFeature")
+        shouting.command_parser = ShoutingCommandParser(
+            keywords=("never",),
+            callbacks=ci.Callback("hey", get_weather))
+        self.processor.features = (self.clock, shouting)
+
+        interpretation = self.processor.process(ci.Message(content="HEY you"))
+        self.assertEqual(interpretation.response(), "weather")
+
+    def test_ignored_chars_do_not_rewrite_message(self):
+        self.clock.command_parser.ignore_all("@")
+        self.processor.features = (self.weather, self.clock)
+
+        message = ci.Message(content="@time@")
+        interpretation = self.processor.process(message)
+        self.assertEqual(interpretation.response(), "time")
+        self.assertEqual(interpretation.original_message, ("@time@",))
+
+    def test_message_is_not_mutated(self):
+        message = ci.Message(content="What time is it?")
+        first = self.processor.process(message)
+        second = self.processor.process(message)
+        self.assertEqual(message.content, "What time is it?")
+        self.assertEqual(first.original_message, second.original_message)
+        self.assertEqual(first.response(), second.response())
+
+    def test_process_many_isolates_errors(self):
+        messages = [ci.Message(content="What time is it?"),
+                    ci.Message(content=None),
+                    ci.Message(content="How is the weather?")]
+        interpretations = list(self.processor.process_many(messages))
+
+        self.assertEqual(len(interpretations), 3)
+        self.assertEqual(interpretations[0].response(), "time")
+        self.assertIsNotNone(interpretations[1].error)
+        self.assertEqual(interpretations[2].response(), "weather")
+
+    def test_aprocess_awaits_sync_and_async_callbacks(self):
+        alarm = ci.Feature(name="AlarmFeature")
+        alarm.command_parser = ci.CommandParser(
+            keywords=("alarm",),
+            callbacks=ci.Callback("alarm", get_time_async))
+        self.processor.features = (self.clock, alarm)
+
+        async def process_both():
+            sync_interpretation = await self.processor.aprocess(ci.Message(content="time"))
+            async_interpretation = await self.processor.aprocess(ci.Message(content="alarm"))
+            return await sync_interpretation.response(), await async_interpretation.response()
+
+        self.assertEqual(asyncio.run(process_both()), ("time", "async time"))
+
+    def test_callback_pool_falls_back_on_timeout(self):
+        self.clock.command_parser.callbacks = ci.Callback("time", get_time_slowly)
+        self.processor.callback_pool = ci.CallbackPool(max_workers=2, timeout=0.05)
+
+        interpretation = self.processor.process(ci.Message(content="time"))
+        self.assertIn(interpretation.response(),
+                      ci.CommandProcessor.DEFAULT_RESPONSES["NoImplementation"])
+
+        self.processor.callback_pool.timeout = None
+        self.assertEqual(interpretation.response(), "slow time")
+        self.processor.callback_pool.shutdown()
+
+    def test_callback_pool_limits_features_separately(self):
+        self.clock.command_parser.callbacks = ci.Callback("time", get_time_slowly)
+        self.weather.command_parser.callbacks = ci.Callback("weather", get_time_slowly)
+        self.processor.callback_pool = ci.CallbackPool(max_workers=4, per_feature_limit=1)
+        fallbacks = ci.CommandProcessor.DEFAULT_RESPONSES["NoImplementation"]
+
+        clock = self.processor.process(ci.Message(content="what time is it"))
+        weather = self.processor.process(ci.Message(content="weather"))
+        self.assertEqual(clock.response.feature_name, "ClockFeature")
+        self.assertEqual(weather.response.feature_name, "WeatherFeature")
+        running = self.processor.callback_pool.submit(clock.response.feature, get_time_slowly)
+
+        # The clock is at its limit, which does not limit the weather
+        self.assertIn(clock.response(), fallbacks)
+        self.assertEqual(weather.response(), "slow time")
+        running.result()
+        self.processor.callback_pool.shutdown()
+
+class TestCallback(TestCase):
+
+    def test_trail_must_follow_lead(self):
+        callback = ci.Callback(lead=("time",), trail=("now",), func=get_time)
+        self.assertTrue(callback.matches(ci.Message(content="Time, now!".split())))
+        self.assertFalse(callback.matches(ci.Message(content="now time".split())))
+
+    def test_ordered_lead(self):
+        callback = ci.Callback(lead=("what", "time"), func=get_time, ordered=True)
+        positions = ci.Callback.word_positions("what time is it".split())
+        self.assertTrue(callback.matches(None, positions))
+        self.assertFalse(callback.matches(ci.Message(content="time what is it".split())))
+
+    def test_matches_tokenized_message(self):
+        callback = ci.Callback(lead=("what", "time"), func=get_time, ordered=True)
+        tokens = ci.TokenizedMessage.from_words(None, "what time is it".split())
+        self.assertTrue(callback.matches(tokens))
+
+    def test_matcher_follows_reassigned_lead(self):
+        callback = ci.Callback(lead=("time",), func=get_time)
+        self.assertTrue(callback.matches(ci.Message(content=["time"])))
+        callback.lead = ("clock",)
+        self.assertFalse(callback.matches(ci.Message(content=["time"])))
+
+
+class TestPronounLookupTable(TestCase):
+
+    def test_lookup(self):
+        self.assertEqual(ci.PronounLookupTable.lookup("what is my name".split()),
+                         (ci.CommandPronoun.INTERROGATIVE, ci.CommandPronoun.POSSESSIVE))
+        self.assertEqual(ci.PronounLookupTable.lookup(["hello"]),
+                         (ci.CommandPronoun.UNIDENTIFIED,))
+        self.assertEqual(ci.PronounLookupTable.lookup(["hello?"]),
+                         (ci.CommandPronoun.INTERROGATIVE,))
+
+    def test_assignment_is_validated(self):
+        identifiers = {"xx": {"personal": ["i"], "interrogative": [], "possessive": ["my"]}}
+        with self.assertRaises(ValueError):
+            ci.PronounLookupTable.assign_pronoun_identifiers(identifiers, "xx")
+        self.assertTrue(ci.PronounLookupTable.lookup(["what"]))
+
+    def test_languages_are_resident_at_once(self):
+        self.assertEqual(ci.PronounLookupTable.lookup(["vad"], "sv-se"),
+                         (ci.CommandPronoun.INTERROGATIVE,))
+        self.assertEqual(ci.PronounLookupTable.lookup(["vad"], "en-us"),
+                         (ci.CommandPronoun.UNIDENTIFIED,))
+        self.assertEqual(ci.PronounLookupTable.detect_language("vad är min tid".split()), "sv-se")
+
+    def test_processor_detects_language(self):
+        processor = ci.CommandProcessor(detect_language=True)
+        processor.features = ()
+        interpretation = processor.process(ci.Message(content="vad är klockan"))
+        self.assertEqual(interpretation.language, "sv-se")
+        self.assertEqual(interpretation.command_pronouns, (ci.CommandPronoun.INTERROGATIVE,))
+
+
+class TestConfiguration(TestCase):
+
+    def test_logger_set_before_configuration_is_kept(self):
+        custom = logging.getLogger("custom")
+        with patch.object(configuration, "_logging_configured", False), \
+                patch.object(configuration, "log", None), \
+                patch.object(ci.logger, "LOG_INSTANCE", None):
+            ci.logger.set_logger(custom)
+            ci.CommandProcessor()
+            self.assertIs(ci.logger.LOG_INSTANCE, custom)
+            self.assertIs(configuration.log, custom)
+            self.assertEqual(custom.handlers, [])
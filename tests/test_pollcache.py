@@ -0,0 +1,262 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+
+from commandintegrator import PollCache
+
+
+class Source:
+    def __init__(self):
+        self.data = {}
+
+    def fetch(self, key, *args, **kwargs):
+        return self.data.get(key)
+
+
+class Unhashable:
+    __hash__ = None
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Unhashable) and other.value == self.value
+
+
+class TestPollCache(TestCase):
+
+    def setUp(self) -> None:
+        self.source = Source()
+
+    def test_returns_only_changes(self):
+        cache = PollCache()
+        self.source.data = {"a": 1, "b": 2}
+        self.assertEqual(cache(self.source.fetch, "a"), 1)
+        self.assertIsNone(cache(self.source.fetch, "a"))
+        self.assertEqual(cache(self.source.fetch, "b"), 2)
+        self.source.data["a"] = 10
+        self.assertEqual(cache(self.source.fetch, "a"), 10)
+        self.assertIsNone(cache(self.source.fetch, "a"))
+        self.assertIsNone(cache(self.source.fetch, "b"))
+
+    def test_silent_first_call(self):
+        cache = PollCache(silent_first_call=True)
+        self.source.data = {"a": 1, "b": 2}
+        self.assertIsNone(cache(self.source.fetch, "a"))
+        self.assertIsNone(cache(self.source.fetch, "b"))
+        self.source.data["b"] = 3
+        self.assertEqual(cache(self.source.fetch, "b"), 3)
+
+    def test_arguments_are_compared_by_content(self):
+        cache = PollCache()
+        self.source.data = {"a": 1}
+        self.assertEqual(cache(self.source.fetch, "a", [1, {"x": {2, 3}}], page={"size": 10, "n": 1}), 1)
+        self.assertIsNone(cache(self.source.fetch, "a", [1, {"x": {3, 2}}], page={"n": 1, "size": 10}))
+        # A tuple is not the same argument as a list
+        self.assertEqual(cache(self.source.fetch, "a", (1, {"x": {2, 3}}), page={"size": 10, "n": 1}), 1)
+        self.assertEqual(len(cache.cached_polls), 2)
+
+    def test_unhashable_arguments(self):
+        cache = PollCache()
+        self.source.data = {"a": 1}
+        self.assertEqual(cache(self.source.fetch, "a", Unhashable(1)), 1)
+        self.assertIsNone(cache(self.source.fetch, "a", Unhashable(1)))
+        self.assertEqual(cache(self.source.fetch, "a", Unhashable(2)), 1)
+        self.source.data["a"] = 5
+        self.assertEqual(cache(self.source.fetch, "a", Unhashable(1)), 5)
+
+    def test_max_entries_evicts_least_recently_polled(self):
+        cache = PollCache(max_entries=2)
+        self.source.data = {"a": 1, "b": 2, "c": 3}
+        cache(self.source.fetch, "a")
+        cache(self.source.fetch, "b")
+        self.assertIsNone(cache(self.source.fetch, "a"))
+        cache(self.source.fetch, "c")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache(self.source.fetch, "a"))
+        # "b" was evicted, and is polled as a first call again
+        self.assertEqual(cache(self.source.fetch, "b"), 2)
+        self.assertEqual(cache.stats, {"hits": 2, "misses": 4, "changes": 0,
+                                       "evictions": 2, "errors": 0, "entries": 2,
+                                       "bytes": 0})
+
+    def test_max_bytes(self):
+        cache = PollCache(max_bytes=2000)
+        self.source.data = {"small": 1, "large": list(range(1000))}
+        cache(self.source.fetch, "small")
+        self.assertLessEqual(cache.size, 2000)
+        cache(self.source.fetch, "large")
+        # The most recent cache is kept even if it is too large
+        self.assertEqual(len(cache), 1)
+        self.assertGreater(cache.stats["bytes"], 2000)
+        self.source.data["large"] = [1]
+        self.assertEqual(cache(self.source.fetch, "large"), [1])
+        self.assertLess(cache.size, 2000)
+        self.assertEqual(cache.stats["changes"], 1)
+
+    def test_ttl(self):
+        cache = PollCache(ttl=60)
+        self.source.data = {"a": 1, "b": 2}
+        with patch("commandintegrator.tools.pollcache.time.monotonic", return_value=0):
+            cache(self.source.fetch, "a")
+            cache(self.source.fetch, "b")
+        with patch("commandintegrator.tools.pollcache.time.monotonic", return_value=50):
+            self.assertIsNone(cache(self.source.fetch, "b"))
+        with patch("commandintegrator.tools.pollcache.time.monotonic", return_value=100):
+            self.assertIsNone(cache(self.source.fetch, "b"))
+            self.assertEqual(cache(self.source.fetch, "a"), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl_set_later(self):
+        cache = PollCache()
+        self.source.data = {"a": 1}
+        with patch("commandintegrator.tools.pollcache.time.monotonic", return_value=0):
+            cache(self.source.fetch, "a")
+        cache.ttl = 60
+        with patch("commandintegrator.tools.pollcache.time.monotonic", return_value=100):
+            self.assertEqual(cache(self.source.fetch, "a"), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_unhashable_arguments_are_evicted(self):
+        cache = PollCache(max_entries=1)
+        self.source.data = {"a": 1}
+        cache(self.source.fetch, "a", Unhashable(1))
+        cache(self.source.fetch, "a", Unhashable(2))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache(self.source.fetch, "a", Unhashable(1)), 1)
+        cache(self.source.fetch, "a")
+        self.assertEqual(cache._unhashable_polls, {})
+
+    def test_compare_digest(self):
+        cache = PollCache(compare="digest")
+        self.source.data = {"a": {"items": [1, 2], "meta": {"x": 1, "y": 2}}}
+        self.assertEqual(cache(self.source.fetch, "a"), self.source.data["a"])
+        self.source.data["a"] = {"meta": {"y": 2, "x": 1}, "items": [1, 2]}
+        self.assertIsNone(cache(self.source.fetch, "a"))
+        self.source.data["a"]["items"].append(3)
+        self.assertEqual(cache(self.source.fetch, "a")["items"], [1, 2, 3])
+        # Only the digest of the result is kept
+        self.assertIsInstance(next(iter(cache.cached_polls.values()))["result"], bytes)
+
+    def test_compare_diff(self):
+        cache = PollCache(compare="diff")
+        self.source.data = {"a": {"items": [1, 2], "meta": {"x": 1, "y": 2}, "z": 0}}
+        self.assertEqual(cache(self.source.fetch, "a"), self.source.data["a"])
+        self.source.data["a"] = {"items": [1, 2, 3], "meta": {"x": 1, "y": 5}, "new": True}
+        self.assertEqual(cache(self.source.fetch, "a"), {"items": {"added": [3], "removed": []},
+                                                         "meta": {"y": 5},
+                                                         "new": True,
+                                                         "z": PollCache.REMOVED})
+        self.assertIsNone(cache(self.source.fetch, "a"))
+
+    def test_compare_diff_lists(self):
+        cache = PollCache(compare="diff")
+        self.source.data = {"a": [{"id": 1}, {"id": 2}, {"id": 2}]}
+        cache(self.source.fetch, "a")
+        self.source.data["a"] = [{"id": 2}, {"id": 1}]
+        self.assertEqual(cache(self.source.fetch, "a"), {"added": [], "removed": [{"id": 2}]})
+        self.source.data["a"] = [{"id": 1}, {"id": 2}]
+        self.assertEqual(cache(self.source.fetch, "a"), {"order": [{"id": 1}, {"id": 2}]})
+        self.source.data["a"] = [[1], {"id": 3}]
+        self.assertEqual(cache(self.source.fetch, "a"), {"added": [[1], {"id": 3}],
+                                                         "removed": [{"id": 1}, {"id": 2}]})
+
+    def test_invalid_compare(self):
+        with self.assertRaises(ValueError):
+            PollCache(compare="hash")
+
+    def test_poll_many(self):
+        cache = PollCache()
+        self.source.data = {"a": 1, "b": 2, "c": None}
+
+        def fail():
+            raise ConnectionError("unreachable")
+
+        polls = [(self.source.fetch, ("a",)), (self.source.fetch, ("b",), {"page": 1}),
+                 (self.source.fetch, ("c",)), fail]
+        self.assertEqual(sorted(result for _, result in cache.poll_many(polls)), [1, 2])
+        self.source.data["b"] = 20
+        self.assertEqual(list(cache.poll_many(polls)), [(polls[1], 20)])
+        self.assertEqual(cache.stats["errors"], 2)
+
+    def test_poll_many_polls_a_key_once_at_a_time(self):
+        cache = PollCache()
+        polling, most = [], []
+        lock = threading.Lock()
+
+        def slow(key):
+            with lock:
+                polling.append(key)
+                most.append(len(polling))
+            time.sleep(0.05)
+            with lock:
+                polling.remove(key)
+            return key
+
+        started = time.monotonic()
+        results = list(cache.poll_many([(slow, ("a",))] * 3 + [(slow, ("b",))] * 3))
+        self.assertEqual(max(most), 2)
+        self.assertEqual(sorted(result for _, result in results), ["a", "b"])
+        self.assertLess(time.monotonic() - started, 0.3)
+
+    def test_apoll_many(self):
+        cache = PollCache()
+        self.source.data = {"a": 1, "b": 2}
+
+        async def fetch(key):
+            await asyncio.sleep(0.01)
+            return self.source.data[key]
+
+        async def poll():
+            return [result async for _, result in
+                    cache.apoll_many([(fetch, ("a",)), (fetch, ("b",)),
+                                      (self.source.fetch, ("a",)), (fetch, ("a",))])]
+
+        self.assertEqual(sorted(asyncio.run(poll())), [1, 1, 2])
+        self.source.data["a"] = 10
+        self.assertEqual(sorted(asyncio.run(poll())), [10, 10])
+
+    def test_threads_and_tasks_share_the_key_locks(self):
+        cache = PollCache()
+        polling, most = [], []
+        lock = threading.Lock()
+
+        def slow(key):
+            with lock:
+                polling.append(key)
+                most.append(len(polling))
+            time.sleep(0.05)
+            with lock:
+                polling.remove(key)
+            return key
+
+        async def poll():
+            return await asyncio.gather(*(cache.acall(slow, "a") for _ in range(3)))
+
+        threads = [threading.Thread(target=cache, args=(slow, "a")) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(poll())
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(most), 6)
+        self.assertEqual(max(most), 1)
+        self.assertEqual(cache._key_locks, {})
+
+    def test_waiting_tasks_do_not_take_executor_threads(self):
+        cache = PollCache()
+
+        def slow(key):
+            time.sleep(0.01)
+            return key
+
+        async def poll():
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(2))
+            return [result async for _, result in cache.apoll_many([(slow, ("a",))] * 10)]
+
+        self.assertEqual(asyncio.run(asyncio.wait_for(poll(), 5)), ["a"])
+        self.assertEqual(cache._key_locks, {})
+        self.assertEqual(cache._key_waiters, {})
@@ -1,8 +1,24 @@
+import asyncio
+import os
+import tempfile
+import threading
 import time
+from datetime import datetime, timedelta
+from queue import Empty
 from unittest import TestCase
+from unittest.mock import patch
 
 import commandintegrator as ci
-from commandintegrator.tools.scheduling.components import Job
+from commandintegrator.core.internals import get_timezone, is_dst
+from commandintegrator.tools.scheduling.channels import OutputChannel
+from commandintegrator.tools.scheduling.components import Job, TimeTrigger
+from commandintegrator.tools.scheduling.cron import CronExpression
+from commandintegrator.tools.scheduling.engine import SchedulerEngine
+from commandintegrator.tools.scheduling.jobstore import JobRecord, SQLiteJobStore, reference
+from commandintegrator.tools.scheduling.metrics import Histogram
+from commandintegrator.tools.scheduling.polling import PollingJob
+from commandintegrator.tools.scheduling.registry import JobRegistry
+from commandintegrator.tools.scheduling.retry import RetryPolicy
 
 
 class Reciever:
@@ -34,6 +50,39 @@ def add_numbers(x, y):
     return x + y
 
 
+def multiply_numbers(x, y):
+    time.sleep(0.01)
+    return x * y
+
+
+def divide_numbers(x, y):
+    return x / y
+
+
+COLLECTED = []
+
+
+def collect(output):
+    COLLECTED.append(output)
+
+
+class SlowCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.most_running = 0
+        self.runs = 0
+
+    def count_slowly(self):
+        with self.lock:
+            self.running += 1
+            self.runs += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(1.5)
+        with self.lock:
+            self.running -= 1
+
+
 class Testschedule(TestCase):
 
     def setUp(self) -> None:
@@ -61,9 +110,10 @@ class Testschedule(TestCase):
         self.assertTrue(ci.schedule.has_outputs(),
                         "There were no outputs in schedule.outputs")
 
-        # Get the output and ensure it's the job
-        job = ci.schedule.outputs.get()
-        self.assertIs(recieved_job, job, "The jobs do not match")
+        # Get the output and ensure it's from the job
+        output = ci.schedule.outputs.get()
+        self.assertEqual(recieved_job.native_id, output.job_id, "The jobs do not match")
+        self.assertEqual(output.result, "Hi, my name is user synchronously")
 
         # Schedule a new job and assert it is not running
         ci.schedule.method(self.user_mock.say_something_async, every="second",
@@ -72,3 +122,528 @@ class Testschedule(TestCase):
                       ci.schedule.get_unstarted_jobs(), "Unstarted job was not in "
                                                         "schedule.get_unstarted_jobs")
 
+
+    def test_jobs_share_the_engine(self):
+        threads_before = threading.active_count()
+        for i in range(50):
+            ci.schedule.method(add_numbers, every="second", x=1, y=2, key=f"add_numbers-{i}",
+                               recipient=self.reciever_mock.recieve)
+        self.assertLess(threading.active_count() - threads_before, 50,
+                        "Jobs should not run on a thread each")
+
+        ci.schedule.kill_job_gracefully("add_numbers")
+        self.assertFalse([job for job in ci.schedule.get_jobs("add_numbers") if job.running],
+                         "Killed jobs were still running")
+
+    def test_async_jobs_share_one_loop(self):
+        loops = []
+
+        async def remember_loop(msg=None):
+            loops.append(asyncio.get_running_loop())
+
+        ci.schedule.method(self.user_mock.get_name_async, every="second",
+                           recipient=remember_loop)
+        time.sleep(2.5)
+        ci.schedule.kill_job_gracefully("get_name_async")
+
+        self.assertGreaterEqual(len(loops), 2, "The async job did not run repeatedly")
+        self.assertTrue(all(loop is loops[0] for loop in loops),
+                        "The async job did not run on a single loop")
+        self.assertIs(loops[0], ci.schedule.async_engine.loop)
+
+    def test_overlap_policies(self):
+        skipping, concurrent = SlowCounter(), SlowCounter()
+        ci.schedule.method(skipping.count_slowly, every="second", overlap="skip",
+                           recipient=self.reciever_mock.recieve)
+        ci.schedule.method(concurrent.count_slowly, every="second", overlap="concurrent",
+                           max_instances=3, recipient=self.reciever_mock.recieve)
+        time.sleep(4.2)
+        ci.schedule.kill_job_gracefully("count_slowly")
+
+        self.assertEqual(skipping.most_running, 1)
+        self.assertLessEqual(skipping.runs, 2)
+        self.assertGreater(concurrent.most_running, 1)
+        self.assertLessEqual(concurrent.most_running, 3)
+
+    def test_sub_second_interval(self):
+        outputs = []
+        ci.schedule.method(add_numbers, every="250ms", x=1, y=2,
+                           recipient=outputs.append)
+        time.sleep(1.2)
+        ci.schedule.kill_job_gracefully("add_numbers")
+        self.assertGreaterEqual(len(outputs), 3)
+
+    def test_output_channels(self):
+        channel = OutputChannel(maxsize=2)
+        ci.schedule.method(add_numbers, every="250ms", x=2, y=2, output_channel=channel)
+        time.sleep(1.2)
+        ci.schedule.kill_job_gracefully("add_numbers")
+
+        self.assertEqual(len(channel), 2)
+        self.assertGreater(channel.dropped, 0)
+        outputs = channel.drain()
+        self.assertEqual([output.result for output in outputs], [4, 4])
+        self.assertLess(outputs[0].run, outputs[1].run)
+        with self.assertRaises(Empty):
+            channel.get_nowait()
+
+
+class Feed:
+    def __init__(self, *values):
+        self.values = list(values)
+
+    def latest(self):
+        return self.values.pop(0) if len(self.values) > 1 else self.values[0]
+
+
+class Rescheduling:
+    def __init__(self):
+        self.intervals = []
+
+    def reschedule(self, job, interval):
+        self.intervals.append(interval)
+        job.trigger.set_interval(interval)
+
+
+class TestPollingJob(TestCase):
+
+    def test_recipient_gets_only_changes(self):
+        outputs, feed = [], Feed(1, 1, 2, 2, {"a": 1, "b": 2}, {"a": 1, "b": 3})
+        ci.schedule.poll(feed.latest, every="100ms", compare="diff", recipient=outputs.append)
+        time.sleep(1)
+        ci.schedule.kill_job_gracefully("latest")
+        self.assertEqual(outputs, [1, 2, {"a": 1, "b": 2}, {"b": 3}])
+        job = list(ci.schedule.get_jobs("latest"))[-1]
+        self.assertIsInstance(job, PollingJob)
+        self.assertGreater(job.trigger.amount_of_runs, len(outputs))
+
+    def test_adaptive_interval(self):
+        engine = Rescheduling()
+        job = PollingJob(func=Feed(1).latest, is_async=False, trigger=TimeTrigger(every="second"),
+                         recipient=collect, func_name="latest", engine=engine,
+                         max_interval=timedelta(seconds=5), backoff=2)
+        results = [1, 1, 1, 1, 1, 2, 2]
+        for result in results:
+            job.result = result
+            job._has_output()
+        self.assertEqual([i.total_seconds() for i in engine.intervals], [2, 4, 5, 1, 2])
+        self.assertEqual(job.interval, timedelta(seconds=2))
+
+        with self.assertRaises(ValueError):
+            PollingJob(func=Feed(1).latest, is_async=False, trigger=TimeTrigger(cron="* * * * *"),
+                       recipient=collect, func_name="latest", max_interval=timedelta(minutes=5))
+
+    def test_set_interval(self):
+        trigger = TimeTrigger(every="hour")
+        slot = trigger.slot
+        trigger.set_interval(timedelta(minutes=10))
+        self.assertEqual(trigger.slot, slot - timedelta(minutes=50))
+        self.assertAlmostEqual(trigger.deadline - time.monotonic(),
+                               (trigger.next_trigger - datetime.now()).total_seconds(), delta=0.1)
+        with self.assertRaises(ValueError):
+            TimeTrigger(at="10:00").set_interval(timedelta(minutes=10))
+
+    def test_engine_reschedules(self):
+        outputs, feed = [], Feed(*range(20))
+        ci.schedule.poll(feed.latest, every="50ms", max_interval="400ms", backoff=4,
+                         recipient=outputs.append)
+        job = list(ci.schedule.get_jobs("latest"))[-1]
+        time.sleep(0.5)
+        self.assertEqual(job.interval, timedelta(milliseconds=50))
+        feed.values = [feed.values[-1]]
+        time.sleep(0.5)
+        self.assertEqual(job.interval, timedelta(milliseconds=400))
+        runs = job.trigger.amount_of_runs
+        time.sleep(0.5)
+        ci.schedule.kill_job_gracefully("latest")
+        self.assertLessEqual(job.trigger.amount_of_runs - runs, 2)
+        self.assertEqual(job.record().options["poll"]["max_interval"], "0.4s")
+
+
+class TestJobRegistry(TestCase):
+
+    @staticmethod
+    def make_job(func=add_numbers, every="hour", engine=None):
+        return Job(func=func, is_async=False, trigger=TimeTrigger(every=every),
+                   recipient=collect, func_name=func.__name__, engine=engine)
+
+    def test_indexes(self):
+        registry, engine = JobRegistry(retention=None), SchedulerEngine()
+        later, sooner = self.make_job(every="hour", engine=engine), self.make_job(every="minute", engine=engine)
+        registry.register(later)
+        registry.register(sooner)
+        self.assertEqual(registry.by_state("pending"), (later, sooner))
+        self.assertEqual(registry.by_name("add_numbers"), (later, sooner))
+        self.assertIs(registry.get(sooner.native_id), sooner)
+
+        later.start()
+        sooner.start()
+        self.assertEqual(registry.by_state("running", "add_numbers"), (later, sooner))
+        self.assertEqual(registry.upcoming(2), (sooner, later))
+
+        later.kill_gracefully()
+        self.assertEqual(registry.by_state("done"), (later,))
+        self.assertEqual(registry.upcoming(2), (sooner,))
+
+        registry.unregister(sooner)
+        sooner.kill_gracefully()
+        self.assertEqual(registry.all(), (later,))
+        self.assertEqual(registry.by_state("done"), (later,))
+
+    def test_finished_jobs_are_evicted(self):
+        def fail():
+            raise RuntimeError("failing on purpose")
+
+        registry, engine = JobRegistry(retention=0), SchedulerEngine()
+        failing = Job(func=fail, is_async=False, trigger=TimeTrigger(exactly_at=datetime.now()),
+                      recipient=collect, func_name="fail", engine=engine)
+        recurring = self.make_job(func=fail, every="250ms", engine=engine)
+        registry.register(failing)
+        registry.register(recurring)
+        failing.start()
+        recurring.start()
+        time.sleep(0.6)
+        recurring.kill_gracefully()
+
+        self.assertEqual(failing.state, "failed")
+        self.assertNotIn(failing, registry)
+        self.assertGreaterEqual(recurring.trigger.amount_of_runs, 2, "Errors should not stop a recurring job")
+
+    def test_finished_jobs_are_not_kept_twice(self):
+        kept, engine = JobRegistry(retention=None), SchedulerEngine()
+        job = self.make_job(engine=engine)
+        kept.register(job)
+        job.start()
+        job.kill_gracefully()
+        self.assertIn(job, kept)
+        self.assertEqual(len(kept._finished), 0, "Without retention, nothing is to be evicted")
+
+        retained = JobRegistry(retention=600)
+        job = self.make_job(engine=engine)
+        retained.register(job)
+        job.start()
+        job.kill_gracefully()
+        self.assertEqual(len(retained._finished), 1)
+        retained.unregister(job)
+        self.assertEqual(len(retained._finished), 0, "Unregistered jobs should be let go")
+
+
+class TestRetryPolicy(TestCase):
+
+    class Flaky:
+        def __init__(self, failures: int):
+            self.failures = failures
+            self.calls = 0
+
+        def __call__(self):
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise ConnectionError("flaky")
+            return "data"
+
+    def make_job(self, func, retry):
+        return Job(func=func, is_async=False, trigger=TimeTrigger(every="hour"),
+                   recipient=collect, func_name="flaky", retry=retry)
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff=0.5, factor=2, max_backoff=3, jitter=0)
+        self.assertEqual([policy.delay(attempt) for attempt in (1, 2, 3, 4)], [0.5, 1, 2, 3])
+        self.assertTrue(policy.should_retry(2, ConnectionError()))
+        self.assertFalse(policy.should_retry(3, ConnectionError()))
+        self.assertFalse(RetryPolicy(retry_on=(KeyError,)).should_retry(1, ConnectionError()))
+
+    def test_retries(self):
+        flaky = self.Flaky(failures=2)
+        job = self.make_job(flaky, RetryPolicy(max_attempts=3, backoff=0.01))
+        self.assertTrue(job.execute())
+        self.assertEqual(flaky.calls, 3)
+        self.assertEqual(job.result, "data")
+
+        flaky = self.Flaky(failures=5)
+        job = self.make_job(flaky, RetryPolicy(max_attempts=2, backoff=0.01))
+        self.assertFalse(job.execute())
+        self.assertEqual(flaky.calls, 2)
+        self.assertTrue(job.alive)
+        self.assertIsInstance(job.error, ConnectionError)
+
+        flaky = self.Flaky(failures=1)
+        job = self.make_job(flaky, RetryPolicy(max_attempts=2, backoff=0.01))
+        self.assertTrue(asyncio.run(job.execute_async()))
+        self.assertEqual(flaky.calls, 2)
+
+    def test_circuit_breaker(self):
+        policy = RetryPolicy(max_attempts=1, breaker_threshold=2, breaker_reset=0.2)
+        flaky = self.Flaky(failures=2)
+        first, second = self.make_job(flaky, policy), self.make_job(flaky, policy)
+        self.assertFalse(first.execute())
+        self.assertFalse(second.execute())
+        # Open for both jobs of the name
+        self.assertFalse(first.execute())
+        self.assertEqual(flaky.calls, 2)
+        self.assertEqual(policy.breaker("flaky").state, "open")
+
+        time.sleep(0.25)
+        self.assertTrue(second.execute())
+        self.assertEqual(policy.breaker("flaky").state, "closed")
+
+
+class TestSchedulerMetrics(TestCase):
+
+    def test_histogram(self):
+        histogram = Histogram()
+        for seconds in (0.0005, 0.02, 0.02, 0.02, 0.3, 700):
+            histogram.observe(seconds)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 6)
+        self.assertEqual(snapshot["max"], 700)
+        self.assertEqual(snapshot["p50"], 0.025)
+        self.assertEqual(snapshot["p99"], 700)
+        self.assertEqual(snapshot["buckets"]["0.001"], 1)
+        self.assertEqual(snapshot["buckets"]["+Inf"], 1)
+        self.assertEqual(Histogram().quantile(0.5), 0)
+
+    def test_jobs_report_metrics(self):
+        ci.schedule.method(multiply_numbers, every="250ms", x=2, y=3, recipient=collect)
+        ci.schedule.method(divide_numbers, every="250ms", x=1, y=0, recipient=collect)
+        time.sleep(1.2)
+        ci.schedule.kill_job_gracefully("multiply_numbers")
+        ci.schedule.kill_job_gracefully("divide_numbers")
+
+        metrics = ci.schedule.get_metrics("multiply_numbers")
+        self.assertGreaterEqual(metrics["runs"], 3)
+        self.assertEqual(metrics["errors"], 0)
+        self.assertEqual(metrics["duration"]["count"], metrics["runs"])
+        self.assertGreaterEqual(metrics["duration"]["max"], 0.01)
+        self.assertGreaterEqual(metrics["lateness"]["count"], metrics["runs"])
+        self.assertGreaterEqual(ci.schedule.get_metrics()["divide_numbers"]["errors"], 1)
+        self.assertEqual(ci.schedule.get_metrics("no_such_job"), {})
+
+
+class TestOutputChannel(TestCase):
+
+    def test_policies(self):
+        for policy, kept in (("drop_oldest", [2, 3]), ("drop_newest", [1, 2]), ("block", [1, 2])):
+            channel = OutputChannel(maxsize=2, policy=policy, timeout=0.1)
+            for i in (1, 2, 3):
+                channel.put(i)
+            self.assertEqual(channel.drain(), kept, policy)
+            self.assertEqual(channel.dropped, 1)
+        with self.assertRaises(ValueError):
+            OutputChannel(policy="drop_everything")
+
+    def test_block_waits_for_room(self):
+        channel = OutputChannel(maxsize=1, policy="block")
+        channel.put(1)
+        threading.Timer(0.2, channel.get).start()
+        self.assertTrue(channel.put(2))
+        self.assertEqual(channel.get(timeout=1), 2)
+
+    def test_async_consumer(self):
+        channel = OutputChannel()
+
+        async def consume():
+            threading.Timer(0.1, channel.put, (1,)).start()
+            threading.Timer(0.2, channel.put, (2,)).start()
+            received = []
+            async for item in channel:
+                received.append(item)
+                if len(received) == 2:
+                    return received
+
+        self.assertEqual(asyncio.run(asyncio.wait_for(consume(), 2)), [1, 2])
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(channel.aget(timeout=0.1))
+
+
+class TestTimeTrigger(TestCase):
+
+    def test_intervals(self):
+        self.assertEqual(TimeTrigger(every="250ms").timedelta_interval, timedelta(milliseconds=250))
+        self.assertEqual(TimeTrigger(every="15 minutes").timedelta_interval, timedelta(minutes=15))
+        self.assertEqual(TimeTrigger(every="every 2 hours").timedelta_interval, timedelta(hours=2))
+        self.assertEqual(TimeTrigger(every="1.5s").timedelta_interval, timedelta(seconds=1.5))
+        self.assertEqual(TimeTrigger(every=timedelta(days=3)).timedelta_interval, timedelta(days=3))
+        for every in ("fortnight", "15 parsecs", "0s"):
+            with self.assertRaises(ValueError):
+                TimeTrigger(every=every)
+
+    def test_missed_intervals_are_coalesced(self):
+        trigger = TimeTrigger(every="minute", exactly_at=datetime.now() - timedelta(hours=5))
+        self.assertGreater(trigger.next_trigger, datetime.now())
+        self.assertLessEqual(trigger.next_trigger, datetime.now() + timedelta(minutes=1))
+
+    def test_days(self):
+        trigger = TimeTrigger(every="monday", at="10:00")
+        self.assertEqual(trigger.next_trigger.weekday(), 0)
+        self.assertGreater(trigger.next_trigger, datetime.now())
+        self.assertLessEqual(trigger.next_trigger, datetime.now() + timedelta(days=7))
+
+    def test_cron(self):
+        cron = CronExpression("*/15 9-17 * * mon-fri")
+        self.assertEqual(cron.next_after(datetime(2020, 7, 3, 17, 50)), datetime(2020, 7, 6, 9, 0))
+        self.assertEqual(cron.next_after(datetime(2020, 7, 6, 9, 0)), datetime(2020, 7, 6, 9, 15))
+        self.assertEqual(CronExpression("@yearly").next_after(datetime(2020, 7, 3)), datetime(2021, 1, 1))
+        self.assertEqual(CronExpression("0 12 29 2 *").next_after(datetime(2021, 3, 1)),
+                         datetime(2024, 2, 29, 12, 0))
+        # Day of month or day of week when both are restricted
+        self.assertEqual(CronExpression("0 0 13 * fri").next_after(datetime(2020, 7, 1)),
+                         datetime(2020, 7, 3))
+        # A field starting with "*" is not a restriction, even with a step
+        self.assertEqual(CronExpression("0 0 */1 * fri").next_after(datetime(2020, 7, 4)),
+                         datetime(2020, 7, 10))
+        cron = CronExpression("0 0 */2 * mon")
+        self.assertEqual(cron.next_after(datetime(2020, 7, 1)), datetime(2020, 7, 13))
+        self.assertEqual(cron.next_after(datetime(2020, 7, 13)), datetime(2020, 7, 27))
+        # Ranges are restrictions, even when covering the whole range
+        self.assertEqual(CronExpression("0 0 1-31 * fri").next_after(datetime(2020, 7, 4)),
+                         datetime(2020, 7, 5))
+        self.assertEqual(CronExpression("0 0 13 * 0-7").next_after(datetime(2020, 7, 1)),
+                         datetime(2020, 7, 2))
+        for expression in ("* * *", "61 * * * *", "* * * foo *", "0 0 30 2 *"):
+            with self.assertRaises(ValueError):
+                CronExpression(expression).next_after(datetime(2020, 1, 1))
+
+        trigger = TimeTrigger(cron="*/5 * * * *")
+        self.assertTrue(trigger.reoccurring)
+        self.assertEqual(trigger.next_trigger.minute % 5, 0)
+        with self.assertRaises(ValueError):
+            TimeTrigger(cron="* * * * *", every="minute")
+
+    def test_jitter(self):
+        for _ in range(20):
+            trigger = TimeTrigger(every="hour", exactly_at=datetime(2030, 1, 1), jitter=30)
+            self.assertGreaterEqual(trigger.next_trigger, datetime(2030, 1, 1, 1))
+            self.assertLessEqual(trigger.next_trigger, datetime(2030, 1, 1, 1, 0, 30))
+            trigger.reset()
+            self.assertGreaterEqual(trigger.next_trigger, datetime(2030, 1, 1, 2))
+            self.assertLessEqual(trigger.next_trigger, datetime(2030, 1, 1, 2, 0, 30))
+
+    def test_timezone_keeps_wall_clock_time_across_dst(self):
+        trigger = TimeTrigger(every="day", at="02:30", timezone="Europe/Stockholm")
+        self.assertIsNotNone(trigger.next_trigger.tzinfo)
+        self.assertIs(trigger.timezone, get_timezone("Europe/Stockholm"))
+
+        def fired_at(now, *, trigger=trigger):
+            with patch.object(trigger, "_now", return_value=now):
+                trigger.reset()
+            return trigger.next_trigger.isoformat()
+
+        # The clock is set forward at 02:00 on 2030-03-31, 02:30 does not exist
+        trigger._slot = datetime(2030, 3, 30, 2, 30)
+        self.assertEqual(fired_at(datetime(2030, 3, 30, 2, 30)), "2030-03-31T03:30:00+02:00")
+        self.assertEqual(fired_at(datetime(2030, 3, 31, 3, 30)), "2030-04-01T02:30:00+02:00")
+        # The clock is set back at 03:00 on 2030-10-27, 02:30 happens twice
+        trigger._slot = datetime(2030, 10, 26, 2, 30)
+        self.assertEqual(fired_at(datetime(2030, 10, 26, 2, 30)), "2030-10-27T02:30:00+02:00")
+        self.assertEqual(fired_at(datetime(2030, 10, 27, 2, 30)), "2030-10-28T02:30:00+01:00")
+
+        # Intervals are exact amounts of time across the change
+        trigger = TimeTrigger(every="hour", timezone="Europe/Stockholm")
+        trigger._slot = datetime(2030, 10, 26, 23)
+        self.assertEqual(fired_at(datetime(2030, 10, 26, 23), trigger=trigger), "2030-10-27T02:00:00+02:00")
+        self.assertEqual(fired_at(datetime(2030, 10, 27, 0), trigger=trigger), "2030-10-27T02:00:00+01:00")
+
+    def test_deadline(self):
+        trigger = TimeTrigger(delay="00:01:00")
+        self.assertAlmostEqual(trigger.deadline - time.monotonic(), 60, delta=1)
+        self.assertFalse(trigger.is_pulled())
+        trigger.deadline = time.monotonic()
+        self.assertTrue(trigger.is_pulled())
+
+    def test_is_dst(self):
+        self.assertTrue(is_dst(datetime(2030, 7, 1)))
+        self.assertFalse(is_dst(datetime(2030, 1, 1)))
+        self.assertFalse(is_dst(datetime(2030, 7, 1), timezone="UTC"))
+
+
+class TestJobStore(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "jobs.sqlite")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_writes_are_batched(self):
+        store = SQLiteJobStore(self.path, batch_size=2, flush_interval=60)
+        store.save(JobRecord("a", None, None, {"kwargs": {}}, 1, slot=datetime(2030, 1, 1)))
+        self.assertEqual(SQLiteJobStore(self.path).load(), {})
+        store.save(JobRecord("b", None, None, {"kwargs": {}}, 2))
+        loaded = SQLiteJobStore(self.path).load()
+        self.assertEqual(set(loaded), {"a", "b"})
+        self.assertEqual(loaded["a"].slot, datetime(2030, 1, 1))
+        self.assertEqual(loaded["b"].amount_of_runs, 2)
+
+        store.remove("a")
+        store.close()
+        self.assertEqual(set(SQLiteJobStore(self.path).load()), {"b"})
+
+    def test_catch_up(self):
+        missed = datetime.now() - timedelta(hours=3, minutes=30)
+
+        trigger = TimeTrigger(every="hour")
+        self.assertTrue(trigger.restore(7, None, missed, catch_up="skip"))
+        self.assertEqual(trigger.amount_of_runs, 7)
+        self.assertFalse(trigger.is_pulled())
+
+        trigger = TimeTrigger(every="hour")
+        trigger.restore(7, None, missed, catch_up="once")
+        self.assertEqual([trigger.is_pulled() for _ in range(3)], [True, False, False])
+
+        trigger = TimeTrigger(every="hour")
+        trigger.restore(7, None, missed, catch_up="all")
+        self.assertEqual([trigger.is_pulled() for _ in range(6)], [True] * 4 + [False] * 2)
+        self.assertGreater(trigger.next_trigger, datetime.now())
+
+        # A trigger that is not reoccurring and was pulled already
+        self.assertFalse(TimeTrigger(delay="00:01").restore(1, missed, missed))
+
+    def test_jobs_have_a_key_each(self):
+        store = SQLiteJobStore(self.path)
+        ci.schedule.job_store = store
+        try:
+            ci.schedule.method(add_numbers, every="hour", x=1, y=2, recipient=collect)
+            ci.schedule.method(add_numbers, every="hour", x=10, y=20, recipient=collect)
+            ci.schedule.method(lambda: 1, every="hour", recipient=collect)
+            ci.schedule.method(lambda: 2, every="hour", recipient=collect)
+            with self.assertRaises(ValueError):
+                ci.schedule.method(add_numbers, every="hour", x=1, y=2, recipient=collect)
+            store.flush()
+            keys = set(SQLiteJobStore(self.path).load())
+            self.assertIn("tests.test_schedule:add_numbers(x=1, y=2)", keys)
+            self.assertIn("tests.test_schedule:add_numbers(x=10, y=20)", keys)
+            self.assertEqual(len(keys), 4)
+            first, second = User("a"), User("b")
+            self.assertNotEqual(ci.schedule.default_key(first.get_name),
+                                ci.schedule.default_key(second.get_name))
+        finally:
+            for job in ci.schedule.get_all_jobs():
+                if job.store is store and job.alive:
+                    job.kill_gracefully()
+            ci.schedule.job_store = None
+            store.close()
+
+    def test_jobs_are_restored(self):
+        rules = dict(at=None, every="hour", delay=None, exactly_at=None,
+                     cron=None, jitter=None, timezone=None)
+        options = dict(rules=rules, kwargs=dict(x=2, y=3), overlap="queue", max_instances=1,
+                       max_queued=1, misfire="run", misfire_grace=None)
+        SQLiteJobStore(self.path).write([JobRecord("restored", reference(add_numbers), reference(collect),
+                                                   options, 5, slot=datetime.now() - timedelta(minutes=90))], [])
+
+        store = SQLiteJobStore(self.path)
+        try:
+            self.assertEqual(ci.schedule.use_job_store(store), 1)
+            job = next(job for job in ci.schedule.get_jobs("add_numbers") if job.key == "restored")
+            time.sleep(0.5)
+            self.assertEqual(job.trigger.amount_of_runs, 6)
+            self.assertIn(5, COLLECTED)
+            self.assertGreater(job.trigger.next_trigger, datetime.now())
+            store.flush()
+            self.assertEqual(SQLiteJobStore(self.path).load()["restored"].amount_of_runs, 6)
+            job.kill_gracefully()
+        finally:
+            ci.schedule.job_store = None
+            store.close()
+        self.assertEqual(SQLiteJobStore(self.path).load(), {})